@@ -10,8 +10,15 @@ from metarace import htlib
 import csv
 import os
 import threading
+import signal
+import atexit
+from time import perf_counter
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from contextlib import suppress
 
+_IMPORTSTART = perf_counter()
+
 gi.require_version("GLib", "2.0")
 from gi.repository import GLib
 
@@ -25,21 +32,19 @@ from metarace import jsonconfig
 from metarace import tod
 from metarace import riderdb
 from metarace.telegraph import telegraph, _CONFIG_SCHEMA as _TG_SCHEMA
-from metarace.export import mirror, _CONFIG_SCHEMA as _EXPORT_SCHEMA
-from metarace.decoder import decoder
-from metarace.decoder.rru import rru, _CONFIG_SCHEMA as _RRU_SCHEMA
-from metarace.decoder.rrs import rrs, _CONFIG_SCHEMA as _RRS_SCHEMA
-from metarace.decoder.thbc import thbc, _CONFIG_SCHEMA as _THBC_SCHEMA
 from metarace.timy import timy, _TIMER_LOG_LEVEL, _CONFIG_SCHEMA as _TIMY_SCHEMA
-from metarace.standards import Factors, _CONFIG_SCHEMA as _STANDARDS_SCHEMA
 from metarace import strops
-from metarace import report
 
 from . import uiutil
 from roadmeet.rms import rms, _CONFIG_SCHEMA as _RMS_SCHEMA
 from roadmeet.irtt import irtt, _CONFIG_SCHEMA as _IRTT_SCHEMA
 from roadmeet.trtt import trtt, _CONFIG_SCHEMA as _TRTT_SCHEMA
-from roadmeet.drelay import _CONFIG_SCHEMA as _DRELAY_SCHEMA
+from roadmeet.drelay import is_batch, parse_batch, _CONFIG_SCHEMA as _DRELAY_SCHEMA
+
+# Deferred modules, imported on first use
+report = uiutil.lazymodule('metarace.report')
+export = uiutil.lazymodule('metarace.export')
+standards = uiutil.lazymodule('metarace.standards')
 
 PRGNAME = 'org._6_v.roadmeet'
 APPNAME = 'Roadmeet'
@@ -48,8 +53,11 @@ LOGFILE_LEVEL = logging.DEBUG
 CONFIGFILE = 'config.json'
 ROADMEET_ID = 'roadmeet-3.2'  # configuration versioning
 EXPORTPATH = 'export'
+_IMPORTCHUNK = 1000  # riderdb entries applied per main loop iteration
+_AUTOSAVE = 60  # headless meet autosave interval in seconds
 _log = logging.getLogger('roadmeet')
 _log.setLevel(logging.DEBUG)
+_LOGWRITER = uiutil.logWriter()  # root log handlers run in writer thread
 ROADRACE_TYPES = {
     'road': 'Road Race',
     'circuit': 'Circuit',
@@ -67,10 +75,14 @@ PRINT_TYPES = {
     'direct': 'Print Direct'
 }
 _HANDLERS = {
-    'null': decoder,
-    'thbc': thbc,
-    'rrs': rrs,
-    'rru': rru,
+    'null': uiutil.lazymodule('metarace.decoder'),
+    'thbc': uiutil.lazymodule('metarace.decoder.thbc'),
+    'rrs': uiutil.lazymodule('metarace.decoder.rrs'),
+    'rru': uiutil.lazymodule('metarace.decoder.rru'),
+}
+_STARTUP = {
+    'enable': False,
+    'marks': [],
 }
 _COLOURMAP = {
     'dark': (
@@ -199,6 +211,25 @@ _CONFIG_SCHEMA = {
         'default': 'preview',
         'hint': 'Ad-hoc report handling'
     },
+    'loglines': {
+        'prompt': 'Log Lines:',
+        'control': 'short',
+        'type': 'int',
+        'attr': 'loglines',
+        'subtext': 'lines',
+        'hint': 'Maximum number of lines kept in the log view',
+        'default': uiutil.LOGVIEWLINES,
+    },
+    'logflush': {
+        'prompt': 'Log Flush:',
+        'control': 'short',
+        'type': 'float',
+        'attr': 'logflush',
+        'subtext': 'seconds',
+        'hint': 'Maximum delay before meet log writes are flushed to disk',
+        'places': 1,
+        'default': uiutil.LOGFILEFLUSH,
+    },
     'sectele': {
         'control': 'section',
         'prompt': 'Telegraph',
@@ -334,6 +365,48 @@ _CONFIG_SCHEMA = {
 }
 
 
+def startup_mark(phase):
+    """Record the end of a startup phase when profiling is enabled."""
+    if _STARTUP['enable']:
+        _STARTUP['marks'].append((phase, perf_counter()))
+
+
+def startup_report():
+    """Print the startup phase timing breakdown and disable profiling."""
+    if not _STARTUP['enable']:
+        return False
+    startup_mark('first idle')
+    _STARTUP['enable'] = False
+    print('Startup profile:')
+    last = _IMPORTSTART
+    for phase, mark in _STARTUP['marks']:
+        print('  %-16s %9.1f ms' % (phase, 1000.0 * (mark - last)))
+        last = mark
+    print('  %-16s %9.1f ms' % ('total', 1000.0 * (last - _IMPORTSTART)))
+    deferred = {
+        'report': report,
+        'export': export,
+        'standards': standards,
+    }
+    deferred.update(_HANDLERS)
+    print('Deferred modules loaded: %s' %
+          (', '.join(k for k in deferred if deferred[k].loaded()) or 'none'))
+    return False
+
+
+def reftags(refid):
+    """Return the set of normalised tags listed in a rider refid."""
+    return set(refid.lower().replace(',', ' ').split())
+
+
+def _decoder_class(devtype):
+    """Import and return the decoder class for devtype."""
+    clsname = devtype
+    if devtype == 'null':
+        clsname = 'decoder'
+    return getattr(_HANDLERS[devtype], clsname)
+
+
 def mkdevice(portstr=None, curdev=None):
     """Return a decoder handle for the provided port specification."""
     # Note: If possible, returns the current device
@@ -351,10 +424,11 @@ def mkdevice(portstr=None, curdev=None):
             devtype = a
         a = c  # shift port into a
     devport = a
+    handler = _decoder_class(devtype)
     if curdev is None:
-        curdev = _HANDLERS[devtype]()
+        curdev = handler()
         curdev.setport(devport)
-    elif type(curdev) is _HANDLERS[devtype]:
+    elif type(curdev) is handler:
         _log.debug('Requested decoder is %s', curdev.__class__.__name__)
         curdev.setport(devport)
     else:
@@ -365,7 +439,7 @@ def mkdevice(portstr=None, curdev=None):
         if wasalive:
             curdev.exit('Change decoder type')
         curdev = None
-        curdev = _HANDLERS[devtype]()
+        curdev = handler()
         curdev.setport(devport)
         _log.debug('Starting %s decoder', curdev.__class__.__name__)
         if wasalive:
@@ -417,11 +491,11 @@ class roadmeet:
 
     def menu_meet_properties_cb(self, menuitem, data=None):
         """Edit meet properties."""
-        metarace.sysconf.add_section('export', _EXPORT_SCHEMA)
+        metarace.sysconf.add_section('export', export._CONFIG_SCHEMA)
         metarace.sysconf.add_section('telegraph', _TG_SCHEMA)
-        metarace.sysconf.add_section('thbc', _THBC_SCHEMA)
-        metarace.sysconf.add_section('rru', _RRU_SCHEMA)
-        metarace.sysconf.add_section('rrs', _RRS_SCHEMA)
+        metarace.sysconf.add_section('thbc', _HANDLERS['thbc']._CONFIG_SCHEMA)
+        metarace.sysconf.add_section('rru', _HANDLERS['rru']._CONFIG_SCHEMA)
+        metarace.sysconf.add_section('rrs', _HANDLERS['rrs']._CONFIG_SCHEMA)
         metarace.sysconf.add_section('timy', _TIMY_SCHEMA)
         cfgres = uiutil.options_dlg(window=self.window,
                                     title='Meet Properties',
@@ -433,7 +507,7 @@ class roadmeet:
                                         },
                                         'export': {
                                             'title': 'Export',
-                                            'schema': _EXPORT_SCHEMA,
+                                            'schema': export._CONFIG_SCHEMA,
                                             'object': metarace.sysconf,
                                         },
                                         'telegraph': {
@@ -448,17 +522,20 @@ class roadmeet:
                                         },
                                         'thbc': {
                                             'title': 'THBC',
-                                            'schema': _THBC_SCHEMA,
+                                            'schema':
+                                            _HANDLERS['thbc']._CONFIG_SCHEMA,
                                             'object': metarace.sysconf,
                                         },
                                         'rru': {
                                             'title': 'RR USB',
-                                            'schema': _RRU_SCHEMA,
+                                            'schema':
+                                            _HANDLERS['rru']._CONFIG_SCHEMA,
                                             'object': metarace.sysconf,
                                         },
                                         'rrs': {
                                             'title': 'RR System',
-                                            'schema': _RRS_SCHEMA,
+                                            'schema':
+                                            _HANDLERS['rrs']._CONFIG_SCHEMA,
                                             'object': metarace.sysconf,
                                         },
                                     })
@@ -524,6 +601,14 @@ class roadmeet:
         if res['timertopic'][0] or res['remoteenable'][0] or tgchg:
             self.remote_reset()
 
+        # update log view line limit
+        if res['loglines'][0]:
+            self.logHandler.set_maxlines(self.loglines)
+
+        # update log file flush interval
+        if res['logflush'][0]:
+            _LOGWRITER.set_interval(self.logflush)
+
         # if type has changed, backup config and reload
         if res['etype'][0]:
             timerchg = True
@@ -921,12 +1006,7 @@ class roadmeet:
                                      parent=self.window,
                                      path='.')
         if sfile is not None:
-            try:
-                self.rdb.clear(notify=False)
-                count = self.rdb.load(sfile)
-                _log.info('Loaded %d entries from %s', count, sfile)
-            except Exception as e:
-                _log.error('%s loading riders: %s', e.__class__.__name__, e)
+            self.import_riders(sfile, 'replace')
         else:
             _log.debug('Replace riders cancelled')
 
@@ -941,11 +1021,7 @@ class roadmeet:
                                      parent=self.window,
                                      path='.')
         if sfile is not None:
-            try:
-                count = self.rdb.load(sfile, overwrite=True)
-                _log.info('Imported %d entries from %s', count, sfile)
-            except Exception as e:
-                _log.error('%s importing: %s', e.__class__.__name__, e)
+            self.import_riders(sfile, 'add')
         else:
             _log.debug('Import riders cancelled')
 
@@ -955,15 +1031,108 @@ class roadmeet:
                                      parent=self.window,
                                      path='.')
         if sfile is not None:
-            try:
-                count = self.rdb.load_chipfile(sfile)
-                _log.info('Imported %d refids from chipfile %s', count, sfile)
-            except Exception as e:
-                _log.error('%s importing chipfile: %s', e.__class__.__name__,
-                           e)
+            self.import_riders(sfile, 'chipfile')
         else:
             _log.debug('Import chipfile cancelled')
 
+    def import_riders(self, sfile, mode='add'):
+        """Import riderdb entries from sfile in the background.
+
+        Mode 'add' overwrites matching entries, 'replace' clears the
+        riderdb first and 'chipfile' only updates rider refids.
+        """
+        if self._import_thread is not None:
+            _log.warning('Rider import already in progress')
+            return False
+        self._import_thread = threading.Thread(
+            target=self._run_import_thread,
+            name='import',
+            args=(sfile, mode),
+            daemon=True,
+        )
+        self._import_thread.start()
+        _log.debug('Started import thread[%s]', self._import_thread.native_id)
+        return True
+
+    def _run_import_thread(self, sfile, mode):
+        """Parse import file into a temporary riderdb."""
+        tdb = None
+        entries = None
+        try:
+            tdb = riderdb.riderdb()
+            tdb.load(sfile)
+            entries = [tdb[r] for r in tdb]
+            _log.debug('Read %d entries from %s', len(entries), sfile)
+        except Exception as e:
+            _log.error('%s importing %s: %s', e.__class__.__name__, sfile, e)
+        GLib.idle_add(self._apply_import, sfile, mode, tdb, entries, 0)
+
+    def _apply_import(self, sfile, mode, tdb, entries, start):
+        """Apply a chunk of imported entries to riderdb."""
+        if not entries:
+            self._import_thread = None
+            _log.info('No entries imported from %s', sfile)
+            return False
+        try:
+            if mode == 'replace':
+                # swap in the complete replacement riderdb in one step
+                cols = list(self.rdb.include_cols)
+                for col in tdb.include_cols:
+                    if col not in cols:
+                        cols.append(col)
+                tdb.include_cols = cols
+                tdb.set_notify(self._rcb)
+                self.rdb = tdb
+                self._import_count = len(entries)
+                end = len(entries)
+            else:
+                if start == 0:
+                    # suspend change notification until import is complete
+                    self._import_count = 0
+                    self._importing = True
+                    for col in tdb.include_cols:
+                        if col not in self.rdb.include_cols:
+                            self.rdb.include_cols.append(col)
+                end = min(len(entries), start + _IMPORTCHUNK)
+                for nr in entries[start:end]:
+                    if mode == 'chipfile':
+                        if nr['refid'] and nr[
+                                'series'] not in riderdb._RESERVED_SERIES:
+                            lr = self.rdb.get_rider(nr['no'], nr['series'])
+                            if lr is not None and nr['refid'] != lr['refid']:
+                                lr['refid'] = nr['refid']
+                                self._import_count += 1
+                    else:
+                        self.rdb.add_rider(nr, notify=False, overwrite=True)
+                        self._import_count += 1
+        except Exception as e:
+            _log.error('%s importing %s: %s', e.__class__.__name__, sfile, e)
+            self._importing = False
+            self._import_thread = None
+            self.ridercb(None)
+            return False
+        if end < len(entries):
+            _log.info('Importing %s: %d/%d', sfile, end, len(entries))
+            GLib.idle_add(self._apply_import,
+                          sfile,
+                          mode,
+                          tdb,
+                          entries,
+                          end,
+                          priority=GLib.PRIORITY_LOW)
+            return False
+
+        # resume notify and send a single update to meet and event
+        self._importing = False
+        self._import_thread = None
+        if mode == 'chipfile':
+            _log.info('Imported %d refids from chipfile %s',
+                      self._import_count, sfile)
+        else:
+            _log.info('Imported %d entries from %s', self._import_count, sfile)
+        self.ridercb(None)
+        return False
+
     def menu_import_startlist_activate_cb(self, menuitem, data=None):
         """Import a startlist."""
         if self.curevent is None:
@@ -977,7 +1146,7 @@ class roadmeet:
     def import_starters(self, sfile):
         """Import starters from the nominated csvfile"""
         if os.path.isfile(sfile):
-            count = 0
+            starters = []
             with open(sfile, encoding='utf-8', errors='replace') as f:
                 cr = csv.reader(f)
                 for r in cr:
@@ -987,12 +1156,9 @@ class roadmeet:
                         series = ''
                         if len(r) > 2:
                             series = r[2].strip()
-                        self.curevent.addrider(bib, series)
-                        start = tod.mktod(r[0])
-                        if start is not None:
-                            self.curevent.starttime(start, bib, series)
-                        count += 1
-            _log.info('Imported %d starters from %s', count, sfile)
+                        starters.append((bib, series, tod.mktod(r[0])))
+            self.curevent.addriders(starters)
+            _log.info('Imported %d starters from %s', len(starters), sfile)
         else:
             _log.debug('Import startlist cancelled')
 
@@ -1095,6 +1261,15 @@ class roadmeet:
             self.obj_announce(command='result', obj=frep.serialise())
 
         # Output files if required
+        self.write_reports(srep, frep)
+
+        # run and await export mirror
+        self.mirror_export()
+        _log.debug('Export thread[%s] complete', self._export_thread.native_id)
+        return False
+
+    def write_reports(self, srep=None, frep=None):
+        """Write each report to all export formats."""
         for r in (srep, frep):
             if r is not None:
                 _log.debug('Writing out report %s', r.id)
@@ -1114,15 +1289,119 @@ class roadmeet:
                 with metarace.savefile(ofile) as f:
                     r.output_html(f, linkbase=lb, linktypes=lt)
 
-        # run and await export mirror
+    def mirror_export(self):
+        """Run and await export mirror, if configured."""
         if self.mirrorpath or self.mirrorcmd:
-            mt = mirror(localpath=os.path.join(EXPORTPATH, ''),
-                        remotepath=self.mirrorpath,
-                        mirrorcmd=self.mirrorcmd)
+            mt = export.mirror(localpath=os.path.join(EXPORTPATH, ''),
+                               remotepath=self.mirrorpath,
+                               mirrorcmd=self.mirrorcmd)
             mt.start()
             mt.join()
-        _log.debug('Export thread[%s] complete', self._export_thread.native_id)
-        return False
+
+    def write_lifexport(self):
+        """Write the current event lif to the export path."""
+        lifdat = self.curevent.lifexport()
+        if len(lifdat) > 0:
+            liffile = os.path.join(self.exportpath, 'lifexport.lif')
+            with metarace.savefile(liffile) as f:
+                cw = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+                for r in lifdat:
+                    cw.writerow(r)
+
+    def build_reports(self, resfiles=None):
+        """Return start and result reports for the current event.
+
+        Reports are only built if resfiles or announceresult are set.
+        If resfiles is None, the meet option is used.
+        """
+        if resfiles is None:
+            resfiles = self.resfiles
+        srep = None
+        frep = None
+        if resfiles or self.announceresult:
+            _log.debug('Building start/finish reports')
+            if self.mirrorfile:
+                filebase = self.mirrorfile
+            else:
+                filebase = '.'
+            if filebase in ('', '.'):
+                filebase = ''
+                if resfiles:
+                    _log.warn('Using default filenames for export')
+            else:
+                pass
+
+            fnv = []
+            if filebase:
+                fnv.append(filebase)
+            fnv.append('startlist')
+            sfile = '_'.join(fnv)
+            fnv[-1] = 'result'
+            ffile = '_'.join(fnv)
+
+            # Include startlist unless event finished
+            if resfiles and self.curevent.timerstat != 'finished':
+                filename = sfile
+                srep = report.report()
+                srep.id = filename
+                self.report_strings(srep)
+                if self.provisionalstart:
+                    srep.set_provisional(True)
+                if self.indexlink:
+                    srep.indexlink = self.indexlink
+                if self.prevlink:
+                    srep.prevlink = '_'.join((self.prevlink, 'startlist'))
+                if self.nextlink:
+                    srep.nextlink = '_'.join((self.nextlink, 'startlist'))
+                srep.resultlink = ffile
+                if self.etype in ('irtt', 'cross', 'trtt'):
+                    for sec in self.curevent.callup_report():
+                        srep.add_section(sec)
+                else:
+                    for sec in self.curevent.startlist_report():
+                        srep.add_section(sec)
+                _log.debug('Startlist report built')
+
+            # Then export a result
+            frep = report.report()
+            self.report_strings(frep)
+
+            # Collect result sections
+            ressecs = self.curevent.result_report()
+
+            # Set provisional status
+            if self.curevent.timerstat != 'finished':
+                frep.set_provisional(True)
+                # include arrivals if configured
+                if self.resarrival:
+                    for sec in self.curevent.arrival_report():
+                        frep.add_section(sec)
+            else:
+                frep.reportstatus = 'final'
+
+            # Add results to body of report
+            for sec in ressecs:
+                frep.add_section(sec)
+
+            # Include result details if configured
+            if self.resdetail:
+                for sec in self.curevent.analysis_report():
+                    frep.add_section(sec)
+
+            filename = ffile
+            frep.id = filename
+            frep.startlink = sfile
+            if self.indexlink:
+                frep.indexlink = self.indexlink
+            if self.prevlink:
+                frep.prevlink = '_'.join((self.prevlink, 'result'))
+            if self.nextlink:
+                frep.nextlink = '_'.join((self.nextlink, 'result'))
+            lb = os.path.join(self.linkbase, filename)
+            lt = ['pdf', 'xlsx']
+            frep.canonical = '.'.join([lb, 'json'])
+            _log.debug('Result report built')
+        return (srep, frep)
 
     def menu_data_results_cb(self, menuitem, data=None):
         """Create result report and/or export"""
@@ -1147,99 +1426,9 @@ class roadmeet:
             self.saveconfig()
 
             if self.lifexport:  # save current lif with export
-                lifdat = self.curevent.lifexport()
-                if len(lifdat) > 0:
-                    liffile = os.path.join(self.exportpath, 'lifexport.lif')
-                    with metarace.savefile(liffile) as f:
-                        cw = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
-                        for r in lifdat:
-                            cw.writerow(r)
-
-            srep = None
-            frep = None
-            if self.resfiles or self.announceresult:
-                _log.debug('Building start/finish reports')
-                if self.mirrorfile:
-                    filebase = self.mirrorfile
-                else:
-                    filebase = '.'
-                if filebase in ('', '.'):
-                    filebase = ''
-                    if self.resfiles:
-                        _log.warn('Using default filenames for export')
-                else:
-                    pass
-
-                fnv = []
-                if filebase:
-                    fnv.append(filebase)
-                fnv.append('startlist')
-                sfile = '_'.join(fnv)
-                fnv[-1] = 'result'
-                ffile = '_'.join(fnv)
-
-                # Include startlist unless event finished
-                if self.resfiles and self.curevent.timerstat != 'finished':
-                    filename = sfile
-                    srep = report.report()
-                    srep.id = filename
-                    self.report_strings(srep)
-                    if self.provisionalstart:
-                        srep.set_provisional(True)
-                    if self.indexlink:
-                        srep.indexlink = self.indexlink
-                    if self.prevlink:
-                        srep.prevlink = '_'.join((self.prevlink, 'startlist'))
-                    if self.nextlink:
-                        srep.nextlink = '_'.join((self.nextlink, 'startlist'))
-                    srep.resultlink = ffile
-                    if self.etype in ('irtt', 'cross', 'trtt'):
-                        for sec in self.curevent.callup_report():
-                            srep.add_section(sec)
-                    else:
-                        for sec in self.curevent.startlist_report():
-                            srep.add_section(sec)
-                    _log.debug('Startlist report built')
-
-                # Then export a result
-                frep = report.report()
-                self.report_strings(frep)
-
-                # Collect result sections
-                ressecs = self.curevent.result_report()
-
-                # Set provisional status
-                if self.curevent.timerstat != 'finished':
-                    frep.set_provisional(True)
-                    # include arrivals if configured
-                    if self.resarrival:
-                        for sec in self.curevent.arrival_report():
-                            frep.add_section(sec)
-                else:
-                    frep.reportstatus = 'final'
-
-                # Add results to body of report
-                for sec in ressecs:
-                    frep.add_section(sec)
-
-                # Include result details if configured
-                if self.resdetail:
-                    for sec in self.curevent.analysis_report():
-                        frep.add_section(sec)
+                self.write_lifexport()
 
-                filename = ffile
-                frep.id = filename
-                frep.startlink = sfile
-                if self.indexlink:
-                    frep.indexlink = self.indexlink
-                if self.prevlink:
-                    frep.prevlink = '_'.join((self.prevlink, 'result'))
-                if self.nextlink:
-                    frep.nextlink = '_'.join((self.nextlink, 'result'))
-                lb = os.path.join(self.linkbase, filename)
-                lt = ['pdf', 'xlsx']
-                frep.canonical = '.'.join([lb, 'json'])
-                _log.debug('Result report built')
+            srep, frep = self.build_reports()
 
             # Bottom half - write to disk and export
             self._export_thread = threading.Thread(
@@ -1415,17 +1604,7 @@ class roadmeet:
                 self.rfuact = False
 
                 # attempt to heal a broken link
-                if self.timer:
-                    if self._timer.connected():
-                        self.rfufail = 0
-                    else:
-                        self.rfufail += 1
-                        if self.rfufail > 20:
-                            self.rfufail = 0
-                            eport = self.timer.split(':', 1)[-1]
-                            self._timer.setport(eport)
-                else:
-                    self.rfufail = 0
+                self.heal_timer()
 
                 # purge status line
                 self.statusHandler.purge()
@@ -1435,6 +1614,20 @@ class roadmeet:
             _log.critical('%s in meet timeout: %s', e.__class__.__name__, e)
         return True
 
+    def heal_timer(self):
+        """Re-connect timer if it has been disconnected for too long."""
+        if self.timer:
+            if self._timer.connected():
+                self.rfufail = 0
+            else:
+                self.rfufail += 1
+                if self.rfufail > 20:
+                    self.rfufail = 0
+                    eport = self.timer.split(':', 1)[-1]
+                    self._timer.setport(eport)
+        else:
+            self.rfufail = 0
+
     ## Window methods
     def set_title(self, extra=''):
         """Update window title from meet properties."""
@@ -1454,9 +1647,8 @@ class roadmeet:
 
     def meet_destroy_cb(self, window, msg=''):
         """Handle destroy signal and exit application."""
-        rootlogger = logging.getLogger()
-        rootlogger.removeHandler(self.statusHandler)
-        rootlogger.removeHandler(self.logHandler)
+        _LOGWRITER.remove(self.statusHandler)
+        _LOGWRITER.remove(self.logHandler)
         #self.window.hide()
         GLib.idle_add(self.meet_destroy_handler)
 
@@ -1466,9 +1658,10 @@ class roadmeet:
         if self.started:
             self.saveconfig()
             self.shutdown()  # threads are joined in shutdown
-        rootlogger = logging.getLogger()
         if self.loghandler is not None:
-            rootlogger.removeHandler(self.loghandler)
+            _LOGWRITER.remove(self.loghandler)
+            self.loghandler.close()
+            self.loghandler = None
         self.running = False
         Gtk.main_quit()
         return False
@@ -1527,6 +1720,7 @@ class roadmeet:
             self._export_thread = None
         _log.debug('Telegraph/announce')
         self.announce.join()
+        _LOGWRITER.drain()
 
     def start(self):
         """Start the timer and rfu threads."""
@@ -1567,15 +1761,14 @@ class roadmeet:
 
         # re-set main log file
         _log.debug('Adding meet logfile handler %r', LOGFILE)
-        rootlogger = logging.getLogger()
         if self.loghandler is not None:
-            rootlogger.removeHandler(self.loghandler)
+            _LOGWRITER.remove(self.loghandler)
             self.loghandler.close()
             self.loghandler = None
-        self.loghandler = logging.FileHandler(LOGFILE)
+        self.loghandler = uiutil.logfileHandler(LOGFILE)
         self.loghandler.setLevel(LOGFILE_LEVEL)
         self.loghandler.setFormatter(logging.Formatter(metarace.LOGFILEFORMAT))
-        rootlogger.addHandler(self.loghandler)
+        _LOGWRITER.add(self.loghandler)
 
         cr.merge(metarace.sysconf, 'roadmeet')
         cr.load(CONFIGFILE)
@@ -1583,7 +1776,7 @@ class roadmeet:
         # Is this meet path an existing trackmeet?
         if cr.has_section('trackmeet'):
             _log.error('Meet folder contains track meet configuration')
-            if not os.isatty(sys.stdout.fileno()):
+            if self.window is not None and not os.isatty(sys.stdout.fileno()):
                 uiutil.messagedlg(
                     message='Invalid meet type.',
                     title='Roadmeet: Error',
@@ -1594,6 +1787,10 @@ class roadmeet:
 
         # Load schema options into meet object
         cr.export_section('roadmeet', self)
+        if self.logHandler is not None:
+            self.logHandler.set_maxlines(self.loglines)
+        _LOGWRITER.set_interval(cr.get_value('roadmeet', 'logflush'))
+        startup_mark('config')
 
         # update hardware ports and telegraph setting
         self.set_timer(self.timer, force=True)
@@ -1609,10 +1806,12 @@ class roadmeet:
         self.rdb.clear(notify=False)
         _log.debug('meet load riders from riders.csv')
         self.rdb.load('riders.csv')
+        startup_mark('riders')
 
         # Open the event
         self.open_event()
         self.set_title()
+        startup_mark('event')
 
         # make sure export path exists
         if not os.path.exists(self.exportpath):
@@ -1680,8 +1879,29 @@ class roadmeet:
         else:
             _log.debug('Remote timer topic not cofigured')
 
+    def remote_batch(self, msg):
+        """Process and dispatch a batch of remote timer messages."""
+        evts = parse_batch(msg)
+        if evts is None:
+            _log.warning('Invalid remote timer batch')
+            return
+        _log.debug('Remote batch of %d passings', len(evts))
+        # dispatch each passing as for a single remote timer message
+        for tval in evts:
+            if 'timy' in tval.source:
+                self._alttimercb(tval)
+            else:
+                tval.index = 'REM'
+                self._timercb(tval)
+        if evts:
+            self.rfustat.update('activity')
+            self.rfuact = True
+
     def remote_timer(self, msg):
         """Process and dispatch a remote timer message."""
+        if is_batch(msg):
+            return self.remote_batch(msg)
+
         # 'INDEX;SOURCE;CHANNEL;REFID;TIMEOFDAY;DATE'
         tv = msg.split(';')
         if len(tv) == 5 or len(tv) == 6:
@@ -1720,14 +1940,74 @@ class roadmeet:
     def getrefid(self, refid):
         """Return a handle to the rider with the suplied refid or None."""
         ret = None
-        refid = refid.lower()
-        if refid in self._tagmap:
-            ret = self.rdb[self._tagmap[refid]]
+        rider = self._tagmap.get(refid)
+        if rider is None:
+            refid = refid.lower()
+            rider = self._tagmap.get(refid)
+        if rider is not None:
+            ret = self.rdb[rider]
         elif 'riderno:' in refid:
             rno, rser = strops.bibstr2bibser(refid.split(':')[-1])
             ret = self.rdb.get_rider(rno, rser)
         return ret
 
+    def _settags(self, rider, refid):
+        """Update tag map with the refids assigned to rider.
+
+        The refid field may list several tags, separated by spaces
+        or commas. A tag claimed by another rider is moved to this rider.
+        A tag released by this rider is moved to any other rider that
+        still lists it.
+        """
+        tags = reftags(refid)
+        otags = self._maptag.pop(rider, set())
+        for tag in otags - tags:
+            if self._tagmap.get(tag) == rider:
+                del self._tagmap[tag]
+                self._retag(tag, rider)
+        for tag in tags:
+            prev = self._tagmap.get(tag)
+            if prev is not None and prev != rider:
+                ptags = self._maptag.get(prev)
+                if ptags is not None:
+                    ptags.discard(tag)
+                    if not ptags:
+                        del self._maptag[prev]
+            self._tagmap[tag] = rider
+        if tags:
+            self._maptag[rider] = tags
+        return tags
+
+    def _retag(self, tag, rider):
+        """Assign tag released by rider to another rider that lists it."""
+        for r in self.rdb:
+            if r != rider:
+                dbr = self.rdb[r]
+                if dbr['series'].lower() != 'cat' and tag in reftags(
+                        dbr['refid']):
+                    self._tagmap[tag] = r
+                    self._maptag.setdefault(r, set()).add(tag)
+                    _log.debug('Tag %r moved to %r', tag, r)
+                    break
+
+    def _listiter(self, model, rider):
+        """Return the iter for rider in a rider list model, or None."""
+        if model is self._rlm:
+            if self._rlmidx is None:
+                self._rlmidx = {lr[7]: lr.iter for lr in model}
+            return self._rlmidx.get(rider)
+        else:
+            if self._clmidx is None:
+                self._clmidx = {lr[7]: lr.iter for lr in model}
+            return self._clmidx.get(rider)
+
+    def _listdel_cb(self, model, path):
+        """Drop list model index after a row is removed, eg by re-order."""
+        if model is self._rlm:
+            self._rlmidx = None
+        else:
+            self._clmidx = None
+
     def ridercb(self, rider):
         """Handle a change in the rider model"""
         if rider is not None:
@@ -1740,61 +2020,48 @@ class roadmeet:
             series = r['series'].lower()
             if series != 'cat':
                 # update refid maps
-                otag = None
-                ntag = r['refid'].lower()
-                if rider in self._maptag:
-                    otag = self._maptag[rider]
-                if otag != ntag:
-                    if rider in self._maptag:
-                        del (self._maptag[rider])
-                    if otag in self._tagmap:
-                        del (self._tagmap[otag])
-                    if ntag:
-                        self._maptag[rider] = ntag
-                        self._tagmap[ntag] = rider
-                    _log.debug('Updated tag map %r = %r', ntag, rider)
+                otags = self._maptag.get(rider, set())
+                ntags = self._settags(rider, r['refid'])
+                if otags != ntags:
+                    _log.debug('Updated tag map %r = %r', ntags, rider)
 
                 # update rider
-                for lr in self._rlm:
-                    if lr[7] == rider:
-                        lr[0] = r.get_bibstr()
-                        lr[1] = style
-                        lr[2] = r.listname()
-                        lr[4] = r['cat']
-                        lr[5] = r['refid']
-                        lr[6] = htlib.escape(summary)
-                        break
+                i = self._listiter(self._rlm, rider)
+                if i is not None:
+                    self._rlm.set(
+                        i, (0, 1, 2, 4, 5, 6),
+                        (r.get_bibstr(), style, r.listname(), r['cat'],
+                         r['refid'], htlib.escape(summary)))
                 else:
                     lr = [
                         r.get_bibstr(), style,
                         r.listname(), '', r['cat'], r['refid'],
                         htlib.escape(summary), rider
                     ]
-                    self._rlm.append(lr)
+                    self._rlmidx[rider] = self._rlm.append(lr)
             else:
-                for lr in self._clm:
-                    if lr[7] == rider:
-                        lr[1] = r['title']
-                        lr[2] = r['subtitle']
-                        lr[3] = r['footer']
-                        lr[4] = r['target']
-                        lr[5] = r['distance']
-                        lr[6] = r['start']
-                        lr[8] = style
-                        found = True
-                        break
+                i = self._listiter(self._clm, rider)
+                if i is not None:
+                    self._clm.set(
+                        i, (1, 2, 3, 4, 5, 6, 8),
+                        (r['title'], r['subtitle'], r['footer'], r['target'],
+                         r['distance'], r['start'], style))
                 else:
                     lr = [
                         rider[0], r['title'], r['subtitle'], r['footer'],
                         r['target'], r['distance'], r['start'], rider, style
                     ]
-                    self._clm.append(lr)
+                    self._clmidx[rider] = self._clm.append(lr)
         else:
-            # assume entire map has to be rebuilt
+            # assume entire map has to be rebuilt, with views detached
             self._tagmap.clear()
             self._maptag.clear()
+            self._rlv.set_model(None)
+            self._clv.set_model(None)
             self._rlm.clear()
             self._clm.clear()
+            rlmidx = {}
+            clmidx = {}
             for r in self.rdb:
                 dbr = self.rdb[r]
                 summary = dbr.summary()
@@ -1805,22 +2072,23 @@ class roadmeet:
                 # note: duplicate ids mangle series, so use series from rider
                 series = dbr['series'].lower()
                 if series != 'cat':
-                    refid = dbr['refid'].lower()
-                    if refid:
-                        self._tagmap[refid] = r
-                        self._maptag[r] = refid
+                    self._settags(r, dbr['refid'])
                     rlr = [
                         dbr.get_bibstr(), style,
                         dbr.listname(), '', dbr['cat'], dbr['refid'],
                         htlib.escape(summary), r
                     ]
-                    self._rlm.append(rlr)
+                    rlmidx[r] = self._rlm.append(rlr)
                 else:
                     rlr = [
                         r[0], dbr['title'], dbr['subtitle'], dbr['footer'],
                         dbr['target'], dbr['distance'], dbr['start'], r, style
                     ]
-                    self._clm.append(rlr)
+                    clmidx[r] = self._clm.append(rlr)
+            self._rlmidx = rlmidx
+            self._clmidx = clmidx
+            self._rlv.set_model(self._rlm)
+            self._clv.set_model(self._clm)
             _log.debug('Re-built refid tagmap: %d entries', len(self._tagmap))
         if self.curevent is not None:
             self.curevent.ridercb(rider)
@@ -1840,7 +2108,8 @@ class roadmeet:
         GLib.idle_add(self.remote_command, topic, message)
 
     def _rcb(self, rider):
-        GLib.idle_add(self.ridercb, rider)
+        if not self._importing:
+            GLib.idle_add(self.ridercb, rider)
 
     def _catcol_cb(self, cell, path, new_text, col):
         """Callback for editing category info"""
@@ -1968,13 +2237,10 @@ class roadmeet:
             if rdb['series'].lower() == 'cat':
                 model = self._clm
                 view = self._clv
-            found = False
-            for r in model:
-                if r[7] == rider:
-                    view.set_cursor(r.path, None, False)
-                    found = True
-                    break
-            if not found:
+            i = self._listiter(model, rider)
+            if i is not None:
+                view.set_cursor(model.get_path(i), None, False)
+            else:
                 _log.debug('Entry %r not found, unable to select', rider)
         return False
 
@@ -2263,11 +2529,16 @@ class roadmeet:
         self.resarrival = False
         self.resdetail = False
         self.doprint = 'preview'
+        self.loglines = uiutil.LOGVIEWLINES
+        self.logflush = uiutil.LOGFILEFLUSH
         self.announceresult = True
 
         # export locking flags
         self._export_lock = threading.Lock()
         self._export_thread = None
+        self._import_thread = None
+        self._import_count = 0
+        self._importing = False  # suppress riderdb notify during import
 
         # printer preferences
         paper = Gtk.PaperSize.new_custom('metarace-full', 'A4 for reports',
@@ -2283,7 +2554,7 @@ class roadmeet:
 
         # hardware connections
         self.timertopic = None  # remote timer topic
-        self._timer = decoder()
+        self._timer = _decoder_class('null')()
         self.timer = ''
         self._timer.setcb(self._timercb)
         self.timercb = None  # set by event app
@@ -2351,18 +2622,18 @@ class roadmeet:
 
         # connect UI log handlers
         _log.debug('Connecting interface log handlers')
-        rootlogger = logging.getLogger()
         f = logging.Formatter(metarace.LOGFORMAT)
         self.statusHandler = uiutil.statusHandler(self.status)
         self.statusHandler.setFormatter(f)
         self.statusHandler.setLevel(logging.INFO)  # show info+
-        rootlogger.addHandler(self.statusHandler)
+        _LOGWRITER.add(self.statusHandler)
         self.logHandler = uiutil.textViewHandler(self.log_buffer,
                                                  self.log_view,
-                                                 self.log_scroll)
+                                                 self.log_scroll,
+                                                 self.loglines)
         self.logHandler.setFormatter(f)
         self.logHandler.setLevel(logging.INFO)  # show info+
-        rootlogger.addHandler(self.logHandler)
+        _LOGWRITER.add(self.logHandler)
 
         # Build a rider list store and view
         self._rlm = Gtk.ListStore(
@@ -2457,8 +2728,12 @@ class roadmeet:
         _log.debug('Add riderdb')
         self.rdb = riderdb.riderdb()
         self.rdb.set_notify(self._rcb)
-        self._tagmap = {}
-        self._maptag = {}
+        self._tagmap = {}  # normalised refid: rider id
+        self._maptag = {}  # rider id: set of normalised refids
+        self._rlmidx = {}  # rider id: iter in rider list model
+        self._clmidx = {}  # cat id: iter in cat list model
+        self._rlm.connect('row-deleted', self._listdel_cb)
+        self._clm.connect('row-deleted', self._listdel_cb)
 
         # select event page in notebook.
         self.notebook.set_current_page(0)
@@ -2471,9 +2746,13 @@ class fakemeet(roadmeet):
     """Non-interactive meet wrapper"""
 
     def __init__(self, rdb):
+        # start from schema defaults, then override for headless use
+        for opt in _CONFIG_SCHEMA.values():
+            if 'attr' in opt:
+                setattr(self, opt['attr'], opt.get('default'))
         self.etype = 'road'
         self.rdb = rdb
-        self._timer = decoder()
+        self._timer = _decoder_class('null')()
         self._alttimer = timy()
         self.stat_but = uiutil.statButton()
         self.action_model = Gtk.ListStore(str, str)
@@ -2521,20 +2800,227 @@ class fakemeet(roadmeet):
         cr.export_section('roadmeet', self)
 
 
+class headlessmeet(fakemeet):
+    """Meet service without a window, controlled over telegraph"""
+
+    # restore announce and config handling replaced in fakemeet
+    cmd_announce = roadmeet.cmd_announce
+    rider_announce = roadmeet.rider_announce
+    timer_announce = roadmeet.timer_announce
+    loadconfig = roadmeet.loadconfig
+
+    def __init__(self, lockfile=None):
+        # event and status widgets are built without a window, but
+        # still require Gtk to be initialised on a display backend
+        if not Gtk.init_check()[0]:
+            _log.error('Headless mode requires a display backend, eg xvfb-run')
+            raise RuntimeError('Unable to init Gtk display')
+        fakemeet.__init__(self, riderdb.riderdb())
+        self.meetlock = lockfile
+        self.loghandler = None
+        self.logHandler = None
+        self.exportpath = EXPORTPATH
+        self.window = None
+        self.event_box = Gtk.Box()
+        self.action_entry = Gtk.Entry()
+        self.rfustat = uiutil.statButton()
+        self.rfuact = False
+        self.rfufail = 0
+
+        # export locking flags
+        self._export_lock = threading.Lock()
+        self._export_thread = None
+        self._import_thread = None
+        self._import_count = 0
+        self._importing = False
+
+        # hardware connections
+        self.timertopic = None
+        self.timer = ''
+        self._timer.setcb(self._timercb)
+        self.timercb = None
+        self.alttimer = ''
+        self._alttimer.setcb(self._alttimercb)
+        self.alttimercb = None
+        self.announce.setcb(self._controlcb)
+        self.anntopic = None
+        self.mirrorpath = ''
+        self.mirrorcmd = None
+
+        # run state
+        self.running = True
+        self.started = False
+        self.curevent = None
+        self._saveage = 0
+
+        # rider tag maps, without list models
+        self._tagmap = {}
+        self._maptag = {}
+        self.rdb.set_notify(self._rcb)
+
+        GLib.timeout_add_seconds(1, self.timeout)
+
+    def set_title(self, extra=''):
+        """Pass meet subtitle through to event."""
+        if self.curevent is not None:
+            self.curevent.set_titlestr(self.subtitle.strip())
+
+    def ridercb(self, rider):
+        """Update tag map and pass rider change through to event."""
+        if rider is not None:
+            r = self.rdb[rider]
+            if r['series'].lower() != 'cat':
+                self._settags(rider, r['refid'])
+        else:
+            self._tagmap.clear()
+            self._maptag.clear()
+            for r in self.rdb:
+                dbr = self.rdb[r]
+                if dbr['series'].lower() != 'cat':
+                    self._settags(r, dbr['refid'])
+            _log.debug('Re-built refid tagmap: %d entries', len(self._tagmap))
+        if self.curevent is not None:
+            self.curevent.ridercb(rider)
+
+    def timeout(self):
+        """Run event timeout, heal timer link and autosave."""
+        try:
+            if self.running:
+                if self.curevent is not None:
+                    self.curevent.timeout()
+                self.rfuact = False
+                self.heal_timer()
+                self._saveage += 1
+                if self._saveage >= _AUTOSAVE:
+                    self._saveage = 0
+                    self.saveconfig()
+            else:
+                return False
+        except Exception as e:
+            _log.critical('%s in meet timeout: %s', e.__class__.__name__, e)
+        return True
+
+    def remote_command(self, topic, msg):
+        """Handle a remote control or timer message."""
+        if self.anntopic:
+            ctlbase = '/'.join((self.anntopic, 'control', ''))
+            if topic.startswith(ctlbase):
+                self.remote_control(topic[len(ctlbase):], msg)
+                return False
+        return roadmeet.remote_command(self, topic, msg)
+
+    def remote_control(self, command, msg):
+        """Apply a control command received on the announce topic."""
+        _log.debug('Remote control %r:%r', command, msg)
+        if command == 'save':
+            self.saveconfig()
+        elif command == 'export':
+            self.menu_data_results_cb(None)
+        elif command == 'armstart':
+            self.menu_event_armstart_activate_cb(None)
+        elif command == 'armlap':
+            self.menu_event_armlap_activate_cb(None)
+        elif command == 'armfinish':
+            self.menu_event_armfin_activate_cb(None)
+        elif command == 'finished':
+            self.menu_event_finished_activate_cb(None)
+        elif command == 'action':
+            # msg is 'ACTION RIDERLIST'
+            acode, sep, rlist = msg.strip().partition(' ')
+            if self.curevent is not None and acode:
+                self.curevent.event_ctrl(acode, rlist.strip())
+        elif command == 'quit':
+            GLib.idle_add(self.meet_destroy_handler)
+        else:
+            _log.info('Unsupported control command %r', command)
+
+
+def export_meet(path):
+    """Load meet at path without a window, recalculate and export.
+
+    Returns None on success, or a message describing the failure.
+    """
+    if not os.path.isdir(path):
+        return 'Meet folder not found'
+    configpath = metarace.config_path(path)
+    if configpath is None:
+        return 'Invalid meet folder'
+    lf = metarace.lockpath(configpath)
+    if lf is None:
+        return 'Meet folder is locked'
+    _LOGWRITER.start()
+    try:
+        os.chdir(configpath)
+        metarace.init()
+        app = headlessmeet(lf)
+        app.loadconfig()
+        if app.curevent is None:
+            return 'No event'
+        app.curevent.recalculate()
+        app.saveconfig()
+        # build and write every format in this process, so that
+        # any failure is reported in the export summary
+        srep, frep = app.build_reports(resfiles=True)
+        app.write_reports(srep, frep)
+        app.write_lifexport()
+        app.mirror_export()
+        app.close_event()
+    except SystemExit:
+        # meet load aborted, reason is written to the meet log
+        return 'Unable to load meet'
+    except BaseException as e:
+        return '%s: %s' % (e.__class__.__name__, e)
+    finally:
+        _LOGWRITER.stop()
+        metarace.unlockpath(configpath, lf)
+    return None
+
+
+def batch_export(paths):
+    """Export meets in paths in parallel, return 0 if all succeed."""
+    paths = list(dict.fromkeys(os.path.abspath(p) for p in paths))
+    if not paths:
+        _log.error('Usage: roadmeet --export PATH [PATH ...]')
+        return 1
+    failed = {}
+    # each meet is exported in a fresh process with its own sysconf
+    with ProcessPoolExecutor(mp_context=get_context('spawn'),
+                             max_tasks_per_child=1) as pool:
+        jobs = {pool.submit(export_meet, p): p for p in paths}
+        for job in as_completed(jobs):
+            path = jobs[job]
+            try:
+                err = job.result()
+            except Exception as e:
+                err = '%s: %s' % (e.__class__.__name__, e)
+            if err:
+                failed[path] = err
+                _log.error('Export %r failed: %s', path, err)
+            else:
+                _log.info('Exported %r', path)
+    print('Exported %d of %d meets' % (len(paths) - len(failed), len(paths)))
+    for path in paths:
+        if path in failed:
+            print('  FAILED %s: %s' % (path, failed[path]))
+    if failed:
+        return 1
+    return 0
+
+
 def edit_defaults():
     """Run a sysconf editor dialog"""
     metarace.sysconf.add_section('roadmeet', _CONFIG_SCHEMA)
     metarace.sysconf.add_section('rms', _RMS_SCHEMA)
     metarace.sysconf.add_section('irtt', _IRTT_SCHEMA)
     metarace.sysconf.add_section('trtt', _TRTT_SCHEMA)
-    metarace.sysconf.add_section('export', _EXPORT_SCHEMA)
+    metarace.sysconf.add_section('export', export._CONFIG_SCHEMA)
     metarace.sysconf.add_section('telegraph', _TG_SCHEMA)
-    metarace.sysconf.add_section('thbc', _THBC_SCHEMA)
-    metarace.sysconf.add_section('rru', _RRU_SCHEMA)
-    metarace.sysconf.add_section('rrs', _RRS_SCHEMA)
+    metarace.sysconf.add_section('thbc', _HANDLERS['thbc']._CONFIG_SCHEMA)
+    metarace.sysconf.add_section('rru', _HANDLERS['rru']._CONFIG_SCHEMA)
+    metarace.sysconf.add_section('rrs', _HANDLERS['rrs']._CONFIG_SCHEMA)
     metarace.sysconf.add_section('timy', _TIMY_SCHEMA)
     metarace.sysconf.add_section('drelay', _DRELAY_SCHEMA)
-    metarace.sysconf.add_section('standards', _STANDARDS_SCHEMA)
+    metarace.sysconf.add_section('standards', standards._CONFIG_SCHEMA)
     cfgres = uiutil.options_dlg(title='Edit Default Configuration',
                                 sections={
                                     'roadmeet': {
@@ -2559,7 +3045,7 @@ def edit_defaults():
                                     },
                                     'export': {
                                         'title': 'Export',
-                                        'schema': _EXPORT_SCHEMA,
+                                        'schema': export._CONFIG_SCHEMA,
                                         'object': metarace.sysconf,
                                     },
                                     'telegraph': {
@@ -2574,17 +3060,20 @@ def edit_defaults():
                                     },
                                     'thbc': {
                                         'title': 'THBC',
-                                        'schema': _THBC_SCHEMA,
+                                        'schema':
+                                        _HANDLERS['thbc']._CONFIG_SCHEMA,
                                         'object': metarace.sysconf,
                                     },
                                     'rru': {
                                         'title': 'RR USB',
-                                        'schema': _RRU_SCHEMA,
+                                        'schema':
+                                        _HANDLERS['rru']._CONFIG_SCHEMA,
                                         'object': metarace.sysconf,
                                     },
                                     'rrs': {
                                         'title': 'RR System',
-                                        'schema': _RRS_SCHEMA,
+                                        'schema':
+                                        _HANDLERS['rrs']._CONFIG_SCHEMA,
                                         'object': metarace.sysconf,
                                     },
                                     'drelay': {
@@ -2594,7 +3083,7 @@ def edit_defaults():
                                     },
                                     'standards': {
                                         'title': 'Standards',
-                                        'schema': _STANDARDS_SCHEMA,
+                                        'schema': standards._CONFIG_SCHEMA,
                                         'object': metarace.sysconf,
                                     },
                                 })
@@ -2664,17 +3153,33 @@ def createmeet():
 
 def main():
     """Run the road meet application as a console script."""
-    chk = Gtk.init_check()
-    if not chk[0]:
-        print('Unable to init Gtk display')
-        sys.exit(-1)
-
-    # attach a console log handler to the root logger
+    if '--startup-profile' in sys.argv:
+        sys.argv.remove('--startup-profile')
+        _STARTUP['enable'] = True
+    headless = False
+    if '--headless' in sys.argv:
+        sys.argv.remove('--headless')
+        headless = True
+    startup_mark('imports')
+
+    # attach a console log handler to the log writer
     ch = logging.StreamHandler()
     ch.setLevel(metarace.LOGLEVEL)
     fh = logging.Formatter(metarace.LOGFORMAT)
     ch.setFormatter(fh)
-    logging.getLogger().addHandler(ch)
+    _LOGWRITER.add(ch)
+    _LOGWRITER.start()
+    atexit.register(_LOGWRITER.stop)
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--export':
+        return batch_export(sys.argv[2:])
+
+    chk = Gtk.init_check()
+    if not chk[0]:
+        print('Unable to init Gtk display')
+        if headless:
+            print('Headless mode requires a display backend, eg xvfb-run')
+        sys.exit(-1)
 
     try:
         GLib.set_prgname(PRGNAME)
@@ -2684,12 +3189,15 @@ def main():
         mset.set_property('gtk-menu-bar-accel', 'F24')
     except Exception as e:
         _log.debug('%s setting property: %s', e.__class__.__name__, e)
+    startup_mark('gtk init')
 
     doconfig = False
     configpath = None
-    if len(sys.argv) > 2:
-        _log.error('Usage: roadmeet [PATH]')
+    if len(sys.argv) > 2 or (headless and len(sys.argv) != 2):
+        _log.error('Usage: roadmeet [--startup-profile] [--headless] [PATH]')
         sys.exit(1)
+    elif headless:
+        configpath = sys.argv[1]
     elif len(sys.argv) == 2:
         if sys.argv[1] == '--edit-default':
             doconfig = True
@@ -2705,7 +3213,7 @@ def main():
     if configpath is None:
         _log.debug('Missing path, command: %r', sys.argv)
         _log.error('Error opening meet')
-        if not os.isatty(sys.stdout.fileno()):
+        if not headless and not os.isatty(sys.stdout.fileno()):
             uiutil.messagedlg(
                 message='Error opening meet.',
                 title='Roadmeet: Error',
@@ -2715,7 +3223,7 @@ def main():
     lf = metarace.lockpath(configpath)
     if lf is None:
         _log.error('Unable to lock meet config, already in use')
-        if not os.isatty(sys.stdout.fileno()):
+        if not headless and not os.isatty(sys.stdout.fileno()):
             uiutil.messagedlg(
                 message='Meet folder is locked.',
                 title='Roadmeet: Locked',
@@ -2724,11 +3232,23 @@ def main():
         sys.exit(-1)
     _log.debug('Entering meet folder %r', configpath)
     os.chdir(configpath)
+    startup_mark('meet folder')
     metarace.init()
+    startup_mark('sysconf')
     if doconfig:
         return edit_defaults()
+    elif headless:
+        app = headlessmeet(lf)
+        app.loadconfig()
+        app.start()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, sig,
+                                 app.meet_destroy_handler)
+        _log.info('Headless meet running in %r', configpath)
+        return Gtk.main()
     else:
         app = roadmeet(None, lf)
+        startup_mark('window')
         mp = configpath
         if mp.startswith(metarace.DATA_PATH):
             mp = mp.replace(metarace.DATA_PATH + '/', '')
@@ -2736,6 +3256,8 @@ def main():
         app.loadconfig()
         app.window.show()
         app.start()
+        startup_mark('start')
+        GLib.idle_add(startup_report)
         return Gtk.main()
 
 
@@ -2,16 +2,25 @@
 """Relay attached decoder passings, translating channels as required."""
 
 import sys
+import os
+import json
+import asyncio
 import logging
+import threading
 import metarace
-from time import sleep
+import paho.mqtt.client as mqtt
+from paho.mqtt.enums import CallbackAPIVersion
+from uuid import uuid4
+from time import monotonic
+from itertools import islice
+from heapq import heappush, heappop
+from collections import OrderedDict, deque
+from decimal import Decimal, InvalidOperation
+from importlib import import_module
 from metarace import tod
 from metarace import strops
 from metarace import jsonconfig
-from metarace.telegraph import telegraph
-from metarace.decoder.rrs import rrs
-from metarace.decoder.rru import rru
-from metarace.decoder.thbc import thbc
+from metarace.telegraph import telegraph, _CONFIG_SCHEMA as _TG_SCHEMA
 
 _log = logging.getLogger('drelay')
 _log.setLevel(logging.DEBUG)
@@ -22,6 +31,20 @@ _TIMERTOPIC = 'timer'
 _TIMERQOS = 1
 _POLLTIME = 10
 _DELAYWARN = 10  # warn if processing delay exceeds this many seconds
+_BATCHVER = 'B1'  # batch timer message version tag
+_BATCHSIZE = 0  # maximum passings per batch message, 0 to disable
+_SPOOLFILE = '.drelay.spool'
+_SPOOLRATE = 20  # maximum spooled messages published per second
+_SPOOLWAIT = 2.0  # seconds to wait for publish acknowledgement
+_SPOOLPOLL = 0.05  # seconds between publish acknowledgement checks
+_SPOOLCOMPACT = 65536  # truncate empty spool file when larger than this
+_RECENTAGE = 600  # discard deadtime records older than this many seconds
+_RECENTMAX = 10000  # maximum number of refids held for deadtime checks
+_STATUSTOPIC = 'drelay/status'
+_RATEWINDOWS = (10, 60, 300)  # passing rate windows in seconds
+_DELAYBINS = (0.1, 0.5, 1, 2, 5, 10)  # delay histogram upper bounds
+_BACKOFFMIN = 1  # initial decoder reconnect delay in seconds
+_REORDER = 1.0  # hold passings from multiple decoders this long to reorder
 _DECODERTYPES = {
     'thbc': 'Chronelec Protime RC/LS',
     'rru': 'RR Active Serial/USB',
@@ -74,6 +97,26 @@ _CONFIG_SCHEMA = {
         'hint': 'Ignore repeated passings for deadtime seconds',
         'default': tod.mktod(2),
     },
+    'recentage': {
+        'attr': '_recentage',
+        'defer': True,
+        'prompt': 'Recent Age:',
+        'subtext': 'seconds',
+        'control': 'short',
+        'type': 'int',
+        'hint': 'Forget refids not seen for this many seconds',
+        'default': _RECENTAGE,
+    },
+    'recentmax': {
+        'attr': '_recentmax',
+        'defer': True,
+        'prompt': 'Recent Max:',
+        'subtext': 'refids',
+        'control': 'short',
+        'type': 'int',
+        'hint': 'Maximum number of refids held for deadtime checks',
+        'default': _RECENTMAX,
+    },
     'polltime': {
         'attr': '_polltime',
         'defer': True,
@@ -84,6 +127,24 @@ _CONFIG_SCHEMA = {
         'hint': 'Check decoder status this often',
         'default': _POLLTIME,
     },
+    'decoders': {
+        'attr': '_decoders',
+        'defer': True,
+        'prompt': 'Decoders:',
+        'hint': 'Config sections of additional decoders, space separated',
+        'default': '',
+    },
+    'reorder': {
+        'attr': '_reorder',
+        'defer': True,
+        'prompt': 'Reorder:',
+        'subtext': 'seconds',
+        'control': 'short',
+        'type': 'float',
+        'places': 1,
+        'hint': 'Hold passings from multiple decoders to merge in time order',
+        'default': _REORDER,
+    },
     'sectele': {
         'prompt': 'Telegraph',
         'control': 'section',
@@ -109,6 +170,47 @@ _CONFIG_SCHEMA = {
         },
         'default': _TIMERQOS,
     },
+    'timerbatch': {
+        'attr': '_timerbatch',
+        'defer': True,
+        'prompt': 'Batch Size:',
+        'subtext': 'passings',
+        'control': 'short',
+        'type': 'int',
+        'hint': 'Batch passings held while offline, 0 to disable',
+        'default': _BATCHSIZE,
+    },
+    'spoolfile': {
+        'attr': '_spoolfile',
+        'defer': True,
+        'prompt': 'Spool File:',
+        'hint': 'Store passings in this file until sent, blank to disable',
+        'default': _SPOOLFILE,
+    },
+    'spoolrate': {
+        'attr': '_spoolrate',
+        'defer': True,
+        'prompt': 'Spool Rate:',
+        'subtext': 'msg/s',
+        'control': 'short',
+        'type': 'int',
+        'hint': 'Maximum rate to send spooled messages',
+        'default': _SPOOLRATE,
+    },
+    'statustopic': {
+        'attr': '_statustopic',
+        'defer': True,
+        'prompt': 'Status Topic:',
+        'hint': 'Telegraph topic to publish relay metrics, blank to disable',
+        'default': _STATUSTOPIC,
+    },
+    'metricsfile': {
+        'attr': '_metricsfile',
+        'defer': True,
+        'prompt': 'Metrics File:',
+        'hint': 'Write relay metrics to this file, blank to disable',
+        'default': '',
+    },
     'secchan': {
         'prompt': 'Channel Re-Mapping',
         'control': 'section',
@@ -206,104 +308,716 @@ _CONFIG_SCHEMA = {
 }
 
 
-class Drelay:
+def timer_message(event):
+    """Return a single line timer message for the provided passing.
 
-    def __init__(self, dosync=False):
-        self._t = telegraph()
+    'INDEX;SOURCE;CHANNEL;REFID;TIMEOFDAY'
+    """
+    source = ''
+    if event.source:
+        source = event.source
+    b = (event.timeval * 0).as_tuple()
+    places = min(-(b.exponent), 5)
+    timestr = event.isostr(places)
+    return ';'.join((event.index, source, event.chan, event.refid, timestr))
+
+
+def batch_record(event):
+    """Return a batch message record for the provided passing.
+
+    'INDEX;SOURCE;CHANNEL;REFID;SECONDS'
+    """
+    source = ''
+    if event.source:
+        source = event.source
+    return ';'.join(
+        (event.index, source, event.chan, event.refid, str(event.timeval)))
+
+
+def record_passing(record):
+    """Return a passing read from a batch message record, or None."""
+    tv = record.split(';')
+    if len(tv) != 5:
+        return None
+    try:
+        tval = tod.tod(Decimal(tv[4]))
+    except (InvalidOperation, ValueError):
+        tval = tod.mktod(tv[4])
+        if tval is None:
+            return None
+    tval.index = tv[0]
+    tval.source = tv[1]
+    tval.chan = tv[2]
+    tval.refid = tv[3]
+    return tval
+
+
+def batch_message(records, date=''):
+    """Return a batch timer message for the provided sequence of records.
+
+    The first line is a header with the version tag, record count
+    and optional date, followed by one line per passing with the
+    time of day as decimal seconds since midnight:
+
+    'B1;COUNT;DATE'
+    'INDEX;SOURCE;CHANNEL;REFID;SECONDS'
+    ...
+    """
+    lines = [';'.join((_BATCHVER, str(len(records)), date))]
+    lines.extend(records)
+    return '\n'.join(lines)
+
+
+def is_batch(msg):
+    """Return True if msg appears to be a batch timer message."""
+    return msg.startswith(_BATCHVER + ';')
+
+
+def parse_batch(msg):
+    """Return a list of passings read from a batch message, or None."""
+    lines = msg.split('\n')
+    hv = lines[0].split(';')
+    if hv[0] != _BATCHVER:
+        _log.debug('Unsupported batch message version: %r', hv[0])
+        return None
+    count = None
+    if len(hv) > 1 and hv[1].isdigit():
+        count = int(hv[1])
+    ret = []
+    for l in lines[1:]:
+        tval = record_passing(l)
+        if tval is not None:
+            ret.append(tval)
+        elif l:
+            _log.debug('Invalid batch record: %r', l)
+    if count is not None and count != len(ret):
+        _log.warning('Batch message count mismatch: %d != %d', len(ret), count)
+    return ret
+
+
+# Options that may be set for each additional decoder section
+_DECODER_SCHEMA = {
+    k: _CONFIG_SCHEMA[k]
+    for k in ('secdec', 'decodertype', 'decoderport', 'deadtime', 'recentage',
+              'recentmax', 'secchan', 'C0', 'C1', 'C2', 'C3', 'C4', 'C5', 'C6',
+              'C7', 'C8', 'C9')
+}
+
+
+class metrics:
+    """Passing rates, delay histogram and per source/channel counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start = monotonic()
+        self._buckets = deque()  # [second, count] of accepted passings
+        self._delays = [0] * (len(_DELAYBINS) + 1)
+        self._counts = {}
+
+    def _count(self, source, chan, idx):
+        key = (source, chan)
+        if key not in self._counts:
+            self._counts[key] = [0, 0, 0]
+        self._counts[key][idx] += 1
+
+    def accept(self, source, chan, delay):
+        """Count an accepted passing with processing delay in seconds."""
+        now = int(monotonic())
+        with self._lock:
+            self._count(source, chan, 0)
+            if self._buckets and self._buckets[-1][0] == now:
+                self._buckets[-1][1] += 1
+            else:
+                self._buckets.append([now, 1])
+            self._expire(now)
+            i = 0
+            while i < len(_DELAYBINS) and delay > _DELAYBINS[i]:
+                i += 1
+            self._delays[i] += 1
+
+    def deadtime(self, source, chan):
+        """Count a passing suppressed during deadtime."""
+        with self._lock:
+            self._count(source, chan, 1)
+
+    def ignore(self, source, chan):
+        """Count a passing on an ignored channel."""
+        with self._lock:
+            self._count(source, chan, 2)
+
+    def _expire(self, now):
+        limit = now - _RATEWINDOWS[-1]
+        while self._buckets and self._buckets[0][0] <= limit:
+            self._buckets.popleft()
+
+    def summary(self):
+        """Return a dict of current metrics."""
+        now = int(monotonic())
+        with self._lock:
+            self._expire(now)
+            elapsed = max(1, now - int(self._start))
+            rates = {}
+            for w in _RATEWINDOWS:
+                c = sum(b[1] for b in self._buckets if b[0] > now - w)
+                rates[str(w)] = round(c / min(w, elapsed), 3)
+            delays = {}
+            for i, b in enumerate(_DELAYBINS):
+                delays['<=%s' % (b, )] = self._delays[i]
+            delays['>%s' % (_DELAYBINS[-1], )] = self._delays[-1]
+            counts = {}
+            for (source, chan), cv in self._counts.items():
+                if source not in counts:
+                    counts[source] = {}
+                counts[source][chan] = {
+                    'accepted': cv[0],
+                    'deadtime': cv[1],
+                    'ignored': cv[2],
+                }
+        return {
+            'time': tod.now().rawtime(0, zeros=True, hoursep=':'),
+            'rate': rates,
+            'delay': delays,
+            'counts': counts,
+        }
+
+
+class recent:
+    """Bounded store of recent passings by refid for deadtime checks.
+
+    Records are kept in order of last arrival, so expiry only
+    inspects the oldest entries.
+    """
+
+    def __init__(self, maxage=_RECENTAGE, maxcount=_RECENTMAX):
+        self._store = OrderedDict()
+        self.maxage = maxage
+        self.maxcount = maxcount
+        self.hits = 0
+        self.misses = 0
+        self.evicts = 0
+
+    def __len__(self):
+        return len(self._store)
+
+    def check(self, event, deadtime):
+        """Record event and return True if outside deadtime of refid."""
+        now = monotonic()
+        ret = True
+        refid = event.refid
+        if refid in self._store:
+            if event - self._store[refid][1] <= deadtime:
+                ret = False
+            self._store.move_to_end(refid)
+        self._store[refid] = (now, event)
+        self._expire(now)
+        if ret:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return ret
+
+    def _expire(self, now):
+        """Remove records older than maxage or exceeding maxcount."""
+        store = self._store
+        while store:
+            if len(store) > self.maxcount:
+                store.popitem(last=False)
+            elif now - next(iter(store.values()))[0] > self.maxage:
+                store.popitem(last=False)
+            else:
+                break
+            self.evicts += 1
+
+
+class spool:
+    """Append-only store and forward spool for passing records.
+
+    Each record is written to the spool file before it is published,
+    and marked done once its publish is acknowledged. Records
+    not marked done are restored in order when the spool is re-opened.
+    With no path provided, records are held in memory only.
+
+    Spool file writes are collected and written by sync, which may
+    be run outside the event loop. Only records already written to the
+    spool file are returned by peek.
+
+    File lines are either 'P;SEQ;RECORD' or 'D;SEQ'.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._fh = None
+        self._lock = threading.Lock()
+        self._iolock = threading.Lock()
+        self._backlog = deque()
+        self._lines = []
+        self._seq = 0
+        self._synced = 0
+
+    def __len__(self):
+        return len(self._backlog)
+
+    def open(self):
+        """Restore outstanding records and open spool file for append."""
+        if not self._path:
+            return
+        pending = OrderedDict()
+        invalid = 0
+        if os.path.exists(self._path):
+            with open(self._path, encoding='utf-8', errors='replace') as f:
+                for l in f:
+                    lv = l.rstrip('\n').split(';', 2)
+                    if len(lv) > 1 and lv[1].isdigit():
+                        seq = int(lv[1])
+                        self._seq = max(self._seq, seq)
+                        if lv[0] == 'P' and len(lv) == 3:
+                            if record_passing(lv[2]) is not None:
+                                pending[seq] = lv[2]
+                            else:
+                                _log.debug('Invalid spool record: %r', l)
+                                invalid += 1
+                        elif lv[0] == 'D' and seq in pending:
+                            del pending[seq]
+                    elif l.strip():
+                        _log.debug('Invalid spool line: %r', l)
+                        invalid += 1
+        if invalid:
+            _log.warning('Dropped %d invalid spool line%s', invalid,
+                         strops.plural(invalid))
+        # re-write spool with only the outstanding records
+        self._fh = open(self._path, 'w', encoding='utf-8')
+        for seq, record in pending.items():
+            self._backlog.append((seq, record))
+            self._fh.write('P;%d;%s\n' % (seq, record))
+        self._fsync()
+        self._synced = self._seq
+        if self._backlog:
+            _log.info('Restored %d spooled passing%s', len(self._backlog),
+                      strops.plural(len(self._backlog)))
+
+    def close(self):
+        """Write outstanding changes and close spool file."""
+        self.sync()
+        with self._iolock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def append(self, record):
+        """Add record to backlog and queue it for writing to spool."""
+        with self._lock:
+            self._seq += 1
+            self._backlog.append((self._seq, record))
+            if self._fh is not None:
+                self._lines.append('P;%d;%s\n' % (self._seq, record))
+            else:
+                self._synced = self._seq
+
+    def unsynced(self):
+        """Return True if there are changes not yet written to spool."""
+        with self._lock:
+            return len(self._lines) > 0
+
+    def sync(self):
+        """Write queued changes to the spool file and fsync."""
+        with self._lock:
+            lines = self._lines
+            self._lines = []
+            seq = self._seq
+            empty = not self._backlog
+        with self._iolock:
+            if self._fh is not None and lines:
+                if empty and self._fh.tell() > _SPOOLCOMPACT:
+                    # every record is done, start a new spool
+                    self._fh.seek(0)
+                    self._fh.truncate()
+                else:
+                    self._fh.write(''.join(lines))
+                self._fsync()
+        with self._lock:
+            self._synced = max(self._synced, seq)
+
+    def peek(self, count=1, skip=0):
+        """Return up to count written records after skipping skip."""
+        with self._lock:
+            return [
+                r for r in islice(self._backlog, skip, skip + count)
+                if r[0] <= self._synced
+            ]
+
+    def done(self, count=1):
+        """Mark the oldest count outstanding records done."""
+        with self._lock:
+            while count > 0 and self._backlog:
+                seq, record = self._backlog.popleft()
+                if self._fh is not None:
+                    self._lines.append('D;%d\n' % (seq, ))
+                count -= 1
+
+    def _fsync(self):
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+
+class relaydecoder:
+    """Attached decoder with channel map and deadtime filter."""
+
+    def __init__(self, name='drelay', dosync=False, metrics=None):
+        self.name = name
+        self._metrics = metrics
         self._d = None
+        self._cb = None
         self._chanmap = {}
-        self._recent = {}
+        self._recent = None
+        self._recentage = _RECENTAGE
+        self._recentmax = _RECENTMAX
         self._decoderport = None
         self._decodertype = None
         self._deadtime = -1
-        self._timertopic = _TIMERTOPIC
-        self._timerqos = _TIMERQOS
-        self._polltime = _POLLTIME
         self._count = 0
         self._delay = 0.0
         self._once = not dosync
 
     def loadconfig(self):
         cr = jsonconfig.config()
-        cr.add_section('drelay', _CONFIG_SCHEMA)
-        cr.merge(metarace.sysconf, 'drelay')
-        cr.export_section('drelay', self)
+        cr.add_section(self.name, _DECODER_SCHEMA)
+        cr.merge(metarace.sysconf, self.name)
+        cr.export_section(self.name, self)
         for cid in range(10):
             chan = strops.id2chan(cid)
-            mapid = cr.get_value('drelay', chan)
+            mapid = cr.get_value(self.name, chan)
             if mapid is not None:
                 self._chanmap[cid] = mapid
-                _log.debug('Channel %s mapped to: %d', chan, mapid)
-        if self._decodertype == 'thbc':
-            self._d = thbc()
-        elif self._decodertype == 'rru':
-            self._d = rru()
-        elif self._decodertype == 'rrs':
-            self._d = rrs()
+                _log.debug('%s channel %s mapped to: %d', self.name, chan,
+                           mapid)
+        if self._decodertype in _DECODERTYPES:
+            # decoder drivers are imported only when configured
+            mod = import_module('metarace.decoder.' + self._decodertype)
+            self._d = getattr(mod, self._decodertype)()
         else:
-            raise RuntimeError('Invalid decoder type %r' % (self._decodertype))
-        if self._polltime < 1:
-            self._polltime = 1
+            raise RuntimeError('Invalid decoder type %r for %s' %
+                               (self._decodertype, self.name))
+        if self._deadtime is None:
+            self._deadtime = tod.ZERO
+        minage = int(self._deadtime.timeval) + 1
+        if self._recentage < minage:
+            self._recentage = minage
+        if self._recentmax < 1:
+            self._recentmax = 1
+        self._recent = recent(self._recentage, self._recentmax)
 
-    def start(self):
-        self._t.start()
+    def start(self, cb):
+        self._cb = cb
         self._d.start()
         self._d.setcb(self.passing)
-        _log.info('Polling decoder status @ %d s', self._polltime)
 
     def passing(self, event):
         cid = strops.chan2id(event.chan)
         if cid in self._chanmap:
             cid = self._chanmap[cid]
         if cid >= 0:  # ignore invalid channel ID: -1
-            since = self._deadtime + tod.ONE
-            if event.refid in self._recent:
-                since = event - self._recent[event.refid]
-            self._recent[event.refid] = event
-            if since > self._deadtime:
+            chan = strops.id2chan(cid)
+            if self._recent.check(event, self._deadtime):
                 # check for loss of sync
                 pt = tod.now()
                 delay = abs(pt.timeval - event.timeval)
                 self._delay = max(self._delay, delay)
                 if delay > _DELAYWARN:
-                    _log.warning('Possible sync loss, delay=%0.1f', delay)
+                    _log.warning('%s possible sync loss, delay=%0.1f',
+                                 self.name, delay)
                 self._count += 1
-
-                event.chan = strops.id2chan(cid)
-                source = ''
-                if event.source:
-                    source = event.source
-                b = (event.timeval * 0).as_tuple()
-                places = min(-(b.exponent), 5)
-                timestr = event.isostr(places)
-                msg = ';'.join(
-                    (event.index, source, event.chan, event.refid, timestr))
-                self._t.publish(topic=self._timertopic,
-                                message=msg,
-                                qos=self._timerqos)
-                _log.info('%s', msg)
+                self._metrics.accept(self.name, chan, float(delay))
+                event.chan = chan
+                self._cb(event)
             else:
+                self._metrics.deadtime(self.name, chan)
                 _log.debug('Ignored passing during deadtme')
         else:
+            self._metrics.ignore(self.name, event.chan)
             _log.debug('Ignored passing')
 
-    def poll(self):
-        if not self._d.connected():
-            self._d.setport(self._decoderport)
-            if not self._once:
-                sleep(0.1)
-                _log.info('Requesting new session')
-                self._d.clear()
+    async def watch(self, polltime):
+        """Reconnect decoder with backoff and request status periodically."""
+        backoff = _BACKOFFMIN
+        while True:
+            if not self._d.connected():
+                self._d.setport(self._decoderport)
+                if not self._once:
+                    await asyncio.sleep(0.1)
+                    _log.info('Requesting new session')
+                    self._d.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(2 * backoff, polltime)
+            else:
+                backoff = _BACKOFFMIN
+                if not self._once:
+                    self._once = True
+                self._d.status()
+                rc = self._recent
+                refs = len(rc)
+                _log.info(
+                    '%s: %d passing%s, %d refid%s, max delay ~%0.1fs, '
+                    'recent hit/miss/evict %d/%d/%d', self.name, self._count,
+                    strops.plural(self._count), refs, strops.plural(refs),
+                    self._delay, rc.hits, rc.misses, rc.evicts)
+                await asyncio.sleep(polltime)
+
+
+class relayclient:
+    """MQTT connection for spooled timer messages.
+
+    Uses the telegraph broker settings on a separate connection,
+    so that each publish returns a message info for acknowledgement.
+    """
+
+    def __init__(self):
+        metarace.sysconf.add_section('telegraph', _TG_SCHEMA)
+        self._host = metarace.sysconf.get_value('telegraph', 'host')
+        self._port = metarace.sysconf.get_value('telegraph', 'port')
+        self._deftopic = metarace.sysconf.get_value('telegraph', 'deftopic')
+        self._connected = False
+        cid = metarace.sysconf.get_value('telegraph', 'clientid')
+        if cid:
+            cid = cid + '-timer'
         else:
-            if not self._once:
-                self._once = True
-            self._d.status()
-            refs = len(self._recent)
-            _log.info('%d passing%s, %d refid%s, max delay ~%0.1fs',
-                      self._count, strops.plural(self._count), refs,
-                      strops.plural(refs), self._delay)
+            cid = str(uuid4())
+        self._client = mqtt.Client(
+            callback_api_version=CallbackAPIVersion.VERSION2, client_id=cid)
+        if metarace.sysconf.get_value('telegraph', 'usetls'):
+            if self._port is None:
+                self._port = 8883
+            self._client.tls_set()
+        if self._port is None:
+            self._port = 1883
+        username = metarace.sysconf.get_value('telegraph', 'username')
+        password = metarace.sysconf.get_value('telegraph', 'password')
+        if username and password:
+            self._client.username_pw_set(username, password)
+        self._client.reconnect_delay_set(2, 16)
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+
+    def start(self):
+        """Connect to broker in the background."""
+        if self._host:
+            _log.debug('Timer connection to %s:%d', self._host, self._port)
+            self._client.connect_async(self._host, self._port)
+            self._client.loop_start()
+
+    def exit(self):
+        """Disconnect from broker."""
+        if self._host:
+            self._client.disconnect()
+            self._client.loop_stop()
+
+    def connected(self):
+        """Return true if connected."""
+        return self._connected
+
+    def publish(self, message, topic=None, qos=1):
+        """Publish message to topic or the default topic.
+
+        Returns the paho message info for acknowledgement checks, or
+        None if the message could not be queued by the client.
+        """
+        if not topic:
+            topic = self._deftopic
+        if not topic or not self._connected:
+            return None
+        mi = self._client.publish(topic, message.encode('utf-8'), qos, False)
+        if mi.rc != 0:
+            _log.debug('Publish to %r failed: %r', topic, mi.rc)
+            return None
+        return mi
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        if reason_code == 0:
+            _log.debug('Timer connection established')
+            self._connected = True
+        else:
+            _log.info('Timer connection failed: %r', reason_code)
+            self._connected = False
+
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties):
+        _log.debug('Timer connection lost: %r', reason_code)
+        self._connected = False
+
+
+class Drelay:
+
+    def __init__(self, dosync=False):
+        self._t = telegraph()
+        self._tc = relayclient()
+        self._loop = None
+        self._dosync = dosync
+        self._decoders = ''
+        self._dlist = []
+        self._metrics = metrics()
+        self._statustopic = _STATUSTOPIC
+        self._metricsfile = ''
+        self._reorder = _REORDER
+        self._mheap = []
+        self._mseq = 0
+        self._timertopic = _TIMERTOPIC
+        self._timerqos = _TIMERQOS
+        self._polltime = _POLLTIME
+        self._timerbatch = _BATCHSIZE
+        self._spoolfile = _SPOOLFILE
+        self._spoolrate = _SPOOLRATE
+        self._spool = None
+        self._spoolev = None
+
+    def loadconfig(self):
+        cr = jsonconfig.config()
+        cr.add_section('drelay', _CONFIG_SCHEMA)
+        cr.merge(metarace.sysconf, 'drelay')
+        cr.export_section('drelay', self)
+        for name in ['drelay'] + self._decoders.split():
+            d = relaydecoder(name, self._dosync, self._metrics)
+            d.loadconfig()
+            self._dlist.append(d)
+        if self._polltime < 1:
+            self._polltime = 1
+        if self._timerbatch < 0:
+            self._timerbatch = 0
+        if self._reorder is None or self._reorder < 0:
+            self._reorder = 0.0
+        if self._spoolrate < 1:
+            self._spoolrate = 1
+        self._spool = spool(self._spoolfile)
+
+    async def run(self):
+        """Start telegraph and decoders, then run relay tasks."""
+        self._loop = asyncio.get_running_loop()
+        self._spoolev = asyncio.Event()
+        self._spool.open()
+        self._t.start()
+        self._tc.start()
+        target = self.relay
+        if len(self._dlist) > 1 and self._reorder > 0:
+            target = self.reorder
+            _log.info('Merging %d decoders with %0.1f s reorder window',
+                      len(self._dlist), self._reorder)
+
+        def cb(event):
+            # decoder thread: hand passing over to the event loop
+            self._loop.call_soon_threadsafe(target, event)
+
+        tasks = [self.drain(), self.status()]
+        for d in self._dlist:
+            d.start(cb)
+            tasks.append(d.watch(self._polltime))
+        _log.info('Polling decoder status @ %d s', self._polltime)
+        await asyncio.gather(*tasks)
+
+    def relay(self, event):
+        """Spool passing for publishing."""
+        self._spool.append(batch_record(event))
+        self._spoolev.set()
+        _log.info('%s', timer_message(event))
+
+    def reorder(self, event):
+        """Add passing to the reorder buffer and schedule its release."""
+        heappush(self._mheap, (event.timeval, self._mseq, monotonic(), event))
+        self._mseq += 1
+        self._loop.call_later(self._reorder, self.merge)
+
+    def merge(self):
+        """Relay buffered passings in time order after reorder window."""
+        while self._mheap:
+            if monotonic() - self._mheap[0][2] < self._reorder:
+                break
+            self.relay(heappop(self._mheap)[3])
+
+    async def drain(self):
+        """Publish spooled passings in order while connected to broker.
+
+        Live passings are published as they arrive and marked done
+        in the spool once acknowledged. A backlog, eg after an outage or
+        restart, is published at spoolrate with each message acknowledged
+        before the next is sent. Unacknowledged messages are re-sent.
+        """
+        inflight = deque()  # (message info, record count, publish time)
+        sent = 0  # spooled records published and awaiting acknowledgement
+        count = 1
+        if self._timerbatch > 0:
+            count = self._timerbatch
+        while True:
+            self._spoolev.clear()
+            while inflight:
+                mi = inflight[0][0]
+                if mi is not None and not mi.is_published():
+                    break
+                ack = inflight.popleft()[1]
+                self._spool.done(ack)
+                sent -= ack
+            if self._spool.unsynced():
+                # spool file writes and fsync run outside the event loop
+                await asyncio.to_thread(self._spool.sync)
+            connected = self._tc.connected()
+            if inflight:
+                if not connected or monotonic() - inflight[0][2] > _SPOOLWAIT:
+                    _log.info('Publish not acknowledged, re-send %d passing%s',
+                              sent, strops.plural(sent))
+                    inflight.clear()
+                    sent = 0
+            pending = len(self._spool) - sent
+            backlog = pending > count
+            if not connected or pending < 1 or (backlog and inflight):
+                timeout = 1.0
+                if inflight:
+                    timeout = _SPOOLPOLL
+                try:
+                    await asyncio.wait_for(self._spoolev.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            recs = [r[1] for r in self._spool.peek(count, sent)]
+            if not recs:
+                continue  # appended while syncing, sync and retry
+            valid = []
+            for r in recs:
+                tval = record_passing(r)
+                if tval is not None:
+                    valid.append(r)
+                else:
+                    _log.warning('Dropped invalid spooled passing: %r', r)
+            mi = None
+            if valid:
+                if len(valid) > 1:
+                    msg = batch_message(valid)
+                else:
+                    msg = timer_message(record_passing(valid[0]))
+                mi = self._tc.publish(msg, self._timertopic, self._timerqos)
+                if mi is None:
+                    await asyncio.sleep(1.0)
+                    continue
+                if len(valid) > 1:
+                    _log.info('Sent batch of %d passings', len(valid))
+            inflight.append((mi, len(recs), monotonic()))
+            sent += len(recs)
+            if backlog:
+                await asyncio.sleep(1.0 / self._spoolrate)
+
+    async def status(self):
+        """Report spool and relay metrics periodically."""
+        while True:
+            await asyncio.sleep(self._polltime)
+            _log.info('%d spooled', len(self._spool))
+            self.report()
 
-        sleep(self._polltime)
+    def report(self):
+        """Publish relay metrics and write to metrics file if configured."""
+        obj = self._metrics.summary()
+        obj['spooled'] = len(self._spool)
+        if self._statustopic:
+            self._t.publish_json(obj=obj, topic=self._statustopic)
+        if self._metricsfile:
+            try:
+                with metarace.savefile(self._metricsfile) as f:
+                    json.dump(obj, f, indent=1)
+            except Exception as e:
+                _log.warning('%s writing metrics: %s', e.__class__.__name__, e)
 
 
 def main():
@@ -332,11 +1046,9 @@ def main():
     metarace.init()
     app = Drelay(dosync)
     app.loadconfig()
-    app.start()
 
-    # check connection periodically
-    while True:
-        app.poll()
+    # run decoder, spool and status tasks
+    return asyncio.run(app.run())
 
 
 if __name__ == '__main__':
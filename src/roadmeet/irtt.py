@@ -5,6 +5,9 @@ import os
 import gi
 import logging
 import threading
+from random import random
+from decimal import Decimal
+from bisect import bisect_left, bisect_right, insort
 
 gi.require_version("GLib", "2.0")
 from gi.repository import GLib
@@ -20,12 +23,13 @@ from metarace import tod
 from metarace import riderdb
 from metarace import strops
 from metarace import countback
-from metarace import report
 from metarace import jsonconfig
 from . import uiutil
 
 from roadmeet.rms import rms, RESERVED_SOURCES, GAPTHRESH
 
+report = uiutil.lazymodule('metarace.report')
+
 _log = logging.getLogger('irtt')
 _log.setLevel(logging.DEBUG)
 
@@ -51,6 +55,7 @@ STARTFUDGE = tod.tod(30)
 STARTGAP = tod.tod('1:00')
 ARRIVALTIMEOUT = tod.tod('2:30')
 _STARTTHRESH = 5
+_IMPULSEKEEP = 1000
 
 # startlist model columns
 COL_BIB = 0
@@ -85,6 +90,11 @@ COL_SERIES = 24
 # autotime tuning parameters
 _START_MATCH_THRESH = tod.tod(_STARTTHRESH)
 _FINISH_MATCH_THRESH = tod.tod('0.300')
+_FINISH_DECIDE = 600  # ms to collect finish passings before assignment
+_FINISH_CONFIDENCE = 0.3  # warn of finish matches below this confidence
+_ETA_MINFIELD = 3  # finishers required to fit category split ratios
+_ETA_RATIOTOL = 0.002  # split ratio change that invalidates category ETAs
+_INTERCOLS = (COL_INTERA, COL_INTERB, COL_INTERC, COL_INTERD, COL_INTERE)
 
 # factored time limits
 _MINFACTOR = tod.tod('0.4').timeval
@@ -181,6 +191,15 @@ _CONFIG_SCHEMA = {
         'hint': 'Check rider start times against schedule',
         'default': True,
     },
+    'impulsekeep': {
+        'prompt': 'Impulse Store:',
+        'control': 'short',
+        'type': 'int',
+        'attr': 'impulsekeep',
+        'subtext': 'impulses',
+        'hint': 'Number of start and finish impulses kept for matching',
+        'default': _IMPULSEKEEP,
+    },
     'showtimers': {
         'prompt': 'Manual Timers:',
         'subtext': 'Show?',
@@ -262,12 +281,343 @@ _CONFIG_SCHEMA = {
 }
 
 
+class impulses:
+    """Bounded time-ordered store of start or finish impulses.
+
+    Counters matched and unmatched include impulses already
+    discarded from the store.
+    """
+
+    def __init__(self, label='', keep=_IMPULSEKEEP):
+        self.label = label
+        self.keep = keep
+        self.matched = 0
+        self.unmatched = 0
+        self._keys = []  # ordered timevals
+        self._store = []  # impulse tods
+        self._used = []  # impulse was matched to a passing
+
+    def __len__(self):
+        return len(self._store)
+
+    def __iter__(self):
+        return iter(self._store)
+
+    def clear(self):
+        """Remove all impulses and reset counters."""
+        self._keys = []
+        self._store = []
+        self._used = []
+        self.matched = 0
+        self.unmatched = 0
+
+    def insert(self, t):
+        """Add impulse t, discarding the oldest beyond keep."""
+        idx = bisect_right(self._keys, t.timeval)
+        self._keys.insert(idx, t.timeval)
+        self._store.insert(idx, t)
+        self._used.insert(idx, False)
+        self.unmatched += 1
+        excess = len(self._store) - self.keep
+        if excess > 0:
+            del self._keys[0:excess]
+            del self._store[0:excess]
+            del self._used[0:excess]
+
+    def window(self, lo, hi, unmatched=False):
+        """Return impulses strictly between timevals lo and hi."""
+        i = bisect_right(self._keys, lo)
+        j = bisect_left(self._keys, hi, i)
+        if unmatched:
+            return [self._store[k] for k in range(i, j) if not self._used[k]]
+        return self._store[i:j]
+
+    def mark(self, t):
+        """Flag impulse t as matched to a passing."""
+        i = bisect_left(self._keys, t.timeval)
+        while i < len(self._store) and self._keys[i] == t.timeval:
+            if self._store[i] is t:
+                if not self._used[i]:
+                    self._used[i] = True
+                    self.matched += 1
+                    self.unmatched -= 1
+                break
+            i += 1
+
+
+def split_ratios(samples):
+    """Return the median split to finish ratio for each intermediate.
+
+    samples is a list of (splits, finish) for finished riders, where
+    splits maps intermediate column to elapsed seconds. Intermediates
+    with fewer than _ETA_MINFIELD samples are omitted.
+    """
+    cols = {}
+    for splits, finish in samples:
+        for col, et in splits.items():
+            cols.setdefault(col, []).append(et / finish)
+    ret = {}
+    for col, rl in cols.items():
+        if len(rl) >= _ETA_MINFIELD:
+            rl.sort()
+            mid = len(rl) // 2
+            if len(rl) % 2:
+                ret[col] = rl[mid]
+            else:
+                ret[col] = 0.5 * (rl[mid - 1] + rl[mid])
+    return ret
+
+
+def predict_elapsed(splits, ratios, fulldist=None):
+    """Return projected elapsed seconds from a rider's splits, or None.
+
+    splits is a list of (col, distance, elapsed seconds) for each
+    intermediate reached. Where field ratios are available, the
+    projection is the ratio estimate over all those splits, which
+    corrects for course profile. Otherwise pace is fitted to all
+    splits with a known distance and scaled to fulldist km.
+    """
+    tsum = 0.0
+    rsum = 0.0
+    dtsum = 0.0
+    ddsum = 0.0
+    for col, dist, et in splits:
+        ratio = ratios.get(col)
+        if ratio:
+            tsum += et
+            rsum += ratio
+        if dist:
+            dtsum += dist * et
+            ddsum += dist * dist
+    ret = None
+    if rsum > 0.0:
+        ret = tsum / rsum
+    elif ddsum > 0.0 and fulldist:
+        ret = fulldist * dtsum / ddsum
+    return ret
+
+
+_RANKLEVELS = 16  # skip list levels in ranklist
+_RANKTAIL = (Decimal('Infinity'), )
+
+
+class ranklist:
+    """Ordered result list with logarithmic insert, remove and rank.
+
+    Drop-in replacement for tod.todlist, stored in an indexable skip
+    list. Each node is [key, (pri, sec), links, widths], where key
+    orders on pri, then sec, then most recent insert first.
+    """
+
+    def __init__(self, lbl=''):
+        self._label = lbl
+        self._seq = 0
+        self.clear()
+
+    def __iter__(self):
+        node = self._head[2][0]
+        while node is not self._tail:
+            yield node[1]
+            node = node[2][0]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, key):
+        if key < 0:
+            key += self._size
+        if key < 0 or key >= self._size:
+            raise IndexError('ranklist index out of range')
+        pos = key + 1
+        node = self._head
+        for lvl in range(_RANKLEVELS - 1, -1, -1):
+            while node[3][lvl] <= pos:
+                pos -= node[3][lvl]
+                node = node[2][lvl]
+        return node[1]
+
+    def _find(self, key):
+        """Return predecessor chain and its positions for key."""
+        chain = [None] * _RANKLEVELS
+        steps = [0] * _RANKLEVELS
+        node = self._head
+        pos = 0
+        for lvl in range(_RANKLEVELS - 1, -1, -1):
+            while node[2][lvl][0] < key:
+                pos += node[3][lvl]
+                node = node[2][lvl]
+            chain[lvl] = node
+            steps[lvl] = pos
+        return chain, steps
+
+    def _unlink(self, key):
+        """Remove node with key from the skip list."""
+        chain, steps = self._find(key)
+        node = chain[0][2][0]
+        if node[0] != key:
+            return
+        depth = len(node[2])
+        for lvl in range(depth):
+            prev = chain[lvl]
+            prev[3][lvl] += node[3][lvl] - 1
+            prev[2][lvl] = node[2][lvl]
+        for lvl in range(depth, _RANKLEVELS):
+            chain[lvl][3][lvl] -= 1
+        self._size -= 1
+
+    def changeno(self, oldno, newno, oldseries='', newseries=''):
+        """Update NO.series in result if it exists."""
+        nodes = self._riders.pop((oldno, oldseries), None)
+        if nodes:
+            for node in nodes:
+                node[1][0].refid = newno
+                node[1][0].index = newseries
+            self._riders.setdefault((newno, newseries), []).extend(nodes)
+            self._riders[(newno, newseries)].sort(key=lambda n: n[0])
+
+    def istime(self, idx):
+        """Return true if there is a valid time at this index."""
+        ret = False
+        if self._size > idx:
+            if not self[idx][0] > tod.FAKETIMES['max']:
+                ret = True
+        return ret
+
+    def rank(self, bib, series=''):
+        """Return current 0-based rank for given bib."""
+        ret = None
+        nodes = self._riders.get((bib, series))
+        if nodes:
+            chain, steps = self._find(nodes[0][0][0:2])
+            ret = steps[0]
+        return ret
+
+    def clear(self):
+        """Clear list"""
+        self._tail = [_RANKTAIL, None, [], []]
+        self._head = [
+            None, None, [self._tail] * _RANKLEVELS, [1] * _RANKLEVELS
+        ]
+        self._size = 0
+        self._riders = {}  # (bib, series): [node, ...] in list order
+        return 0
+
+    def remove(self, bib, series='', once=False):
+        nodes = self._riders.pop((bib, series), None)
+        if nodes:
+            if once:
+                self._unlink(nodes[0][0])
+                if len(nodes) > 1:
+                    self._riders[(bib, series)] = nodes[1:]
+            else:
+                for node in nodes:
+                    self._unlink(node[0])
+        return self._size
+
+    def insert(self, pri=None, sec=None, bib=None, series=''):
+        """Insert primary tod and secondary tod into ordered list."""
+        ret = None
+        if isinstance(pri, str) and pri in tod.FAKETIMES:
+            pri = tod.FAKETIMES[pri]
+
+        if isinstance(pri, tod.tod):
+            if bib is None:
+                bib = pri.index
+            if sec is None:
+                sec = tod.ZERO
+            rt0 = tod.tod(pri, chan=self._label, refid=bib, index=series)
+            rt1 = tod.tod(sec, chan=self._label, refid=bib, index=series)
+            self._seq += 1
+            key = (rt0.timeval, rt1.timeval, -self._seq)
+            chain, steps = self._find(key)
+            ret = steps[0]
+            depth = 1
+            while depth < _RANKLEVELS and random() < 0.5:
+                depth += 1
+            node = [key, (rt0, rt1), [None] * depth, [0] * depth]
+            for lvl in range(depth):
+                prev = chain[lvl]
+                gap = ret - steps[lvl]
+                node[2][lvl] = prev[2][lvl]
+                prev[2][lvl] = node
+                node[3][lvl] = prev[3][lvl] - gap
+                prev[3][lvl] = gap + 1
+            for lvl in range(depth, _RANKLEVELS):
+                chain[lvl][3][lvl] += 1
+            self._size += 1
+            nodes = self._riders.setdefault((bib, series), [])
+            insort(nodes, node, key=lambda n: n[0])
+        return ret
+
+
+def assign_impulses(passings, impulses, thresh):
+    """Jointly assign ordered impulses to ordered passings.
+
+    Return a list with one (impulse, confidence) pair for each passing,
+    chosen to minimise total time error while preserving order.
+    Passings without an impulse inside thresh seconds are assigned
+    (None, 0.0). Confidence is the margin between the matched impulse
+    and the next nearest impulse, as a fraction of thresh.
+    """
+    pv = [float(p.timeval) for p in passings]
+    qv = [float(q.timeval) for q in impulses]
+    th = float(thresh)
+    n = len(pv)
+    m = len(qv)
+
+    # cost[i][j]: best total error for first i passings, first j impulses
+    cost = [[0.0] * (m + 1) for i in range(n + 1)]
+    move = [[0] * (m + 1) for i in range(n + 1)]
+    for i in range(1, n + 1):
+        cost[i][0] = i * th
+        move[i][0] = 1
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            best = cost[i][j - 1]  # skip impulse
+            bm = 0
+            c = cost[i - 1][j] + th  # passing not matched
+            if c < best:
+                best = c
+                bm = 1
+            err = abs(pv[i - 1] - qv[j - 1])
+            if err < th:
+                c = cost[i - 1][j - 1] + err
+                if c < best:
+                    best = c
+                    bm = 2
+            cost[i][j] = best
+            move[i][j] = bm
+
+    ret = [(None, 0.0)] * n
+    i = n
+    j = m
+    while i > 0:
+        bm = move[i][j]
+        if bm == 0:
+            j -= 1
+        elif bm == 1:
+            i -= 1
+        else:
+            err = abs(pv[i - 1] - qv[j - 1])
+            alt = th
+            for k in range(m):
+                if k != j - 1:
+                    alt = min(alt, abs(pv[i - 1] - qv[k]))
+            conf = max(0.0, min(1.0, (alt - err) / th))
+            ret[i - 1] = (impulses[j - 1], conf)
+            i -= 1
+            j -= 1
+    return ret
+
+
 class irtt(rms):
     """Data handling for road time trial."""
 
     def resettimer(self):
         """Return event to idle and remove all results"""
         _log.debug('Reset')
+        self.eta_clear()
+        self.arrival_clear()
         self.startpasses.clear()
         self.finishpasses.clear()
         self.resetall()
@@ -362,6 +712,8 @@ class irtt(rms):
         """Edit the rider's start time."""
         newst = tod.mktod(new_text)
         if newst is not None:
+            self.eta_clear(self.riders[path][COL_BIB],
+                           self.riders[path][COL_SERIES])
             if self.riders[path][COL_TODSTART] is not None:
                 self.riders[path][COL_TODSTART] = newst
                 _log.info(
@@ -372,6 +724,8 @@ class irtt(rms):
             else:
                 newst = newst.truncate(0)
                 self.riders[path][COL_WALLSTART] = newst
+                self.sched_update(self.riders[path][COL_BIB],
+                                  self.riders[path][COL_SERIES], newst)
                 _log.info(
                     'Adjusted rider %s advertised start time: %s',
                     strops.bibser2bibstr(self.riders[path][COL_BIB],
@@ -411,35 +765,116 @@ class irtt(rms):
         self.meet.rider_announce([place, bib, shortname, cat, rts], 'finpanel')
         self.meet.rider_announce([place, bib, namestr, cat, rts], 'finish')
 
+    def eta_clear(self, bib=None, series=''):
+        """Invalidate cached ETA for rider, or all riders if bib is None."""
+        self._etadirty = True  # splits or finish may have changed
+        if bib is None:
+            self._etacache.clear()
+        else:
+            self._etacache.pop((bib, series), None)
+
     def geteta(self, iter):
-        """Return a best guess rider's ET."""
+        """Return a best guess rider's ET, using cached value if valid."""
+        key = (self.riders.get_value(iter, COL_BIB),
+               self.riders.get_value(iter, COL_SERIES))
+        ce = self._etacache.get(key)
+        if ce is not None and ce[0] == self.meet.distance:
+            ret = ce[1]
+            if ce[2] is not None:
+                if self.riders.get_value(iter, COL_DIST) != ce[2]:
+                    self.riders.set_value(iter, COL_DIST, ce[2])
+            return ret
+        ret, dist = self._calceta(iter)
+        self._etacache[key] = (self.meet.distance, ret, dist)
+        return ret
+
+    def _calceta(self, iter):
+        """Return a best guess rider's ET and inter distance reached."""
+        rdist = None
         ret = self.getelapsed(iter)
         if ret is None:
-            # fetch rider's total disance
-            cs = self.riders.get_value(iter, COL_CAT)
-            rcat = self.ridercat(riderdb.primary_cat(cs))
-            fulldist = self.catdistance(rcat)
-            if fulldist is not None:
-                # scan each inter from farthest to nearest
-                for ipt in (COL_INTERE, COL_INTERD, COL_INTERC, COL_INTERB,
-                            COL_INTERA):
-                    if ipt in self.ischem and self.ischem[ipt] is not None:
-                        dist = self.ischem[ipt]['dist']
-                        inter = self.riders.get_value(iter, ipt)
-                        if inter is not None and dist is not None:
-                            totdist = 1000.0 * fulldist
-                            st = self.riders.get_value(iter, COL_TODSTART)
-                            if st is None:  # defer to start time
-                                st = self.riders.get_value(iter, COL_WALLSTART)
-                            if st is not None:  # still none is error
-                                et = inter - st
-                                spd = (1000.0 * dist) / float(et.timeval)
-                                ret = tod.mktod(str(totdist / spd))
-                                self.riders.set_value(iter, COL_DIST,
-                                                      int(dist))
-                                break
+            st = self.riders.get_value(iter, COL_TODSTART)
+            if st is None:  # defer to start time
+                st = self.riders.get_value(iter, COL_WALLSTART)
+            splits = self.getsplits(iter, st)
+            if splits:
+                cs = self.riders.get_value(iter, COL_CAT)
+                rcat = self.ridercat(riderdb.primary_cat(cs))
+                fulldist = self.catdistance(rcat)
+                et = predict_elapsed(splits, self._etaratios.get(rcat, {}),
+                                     fulldist)
+                if et is not None:
+                    ret = tod.mktod(str(et))
+                    for col, dist, split in splits:
+                        if dist is not None:
+                            rdist = int(dist)
+                    if rdist is not None:
+                        self.riders.set_value(iter, COL_DIST, rdist)
+        return ret, rdist
+
+    def getsplits(self, iter, st):
+        """Return a list of (col, dist, elapsed seconds) for rider inters."""
+        ret = []
+        if st is not None:
+            for col in _INTERCOLS:
+                sch = self.ischem.get(col)
+                inter = self.riders.get_value(iter, col)
+                if sch is not None and inter is not None:
+                    et = float((inter - st).timeval)
+                    if et > 0.0:
+                        ret.append((col, sch['dist'], et))
         return ret
 
+    def eta_fit(self):
+        """Fit per-category split ratios from finished riders.
+
+        Ratios are only re-fitted after a rider's ETA is invalidated.
+        Cached ETAs are invalidated for categories with a ratio change
+        larger than _ETA_RATIOTOL.
+        """
+        if not self._etadirty:
+            return
+        self._etadirty = False
+        samples = {}
+        for r in self.riders:
+            if r[COL_TODFINISH] is not None and not r[COL_COMMENT]:
+                st = r[COL_TODSTART]
+                if st is None:
+                    st = r[COL_WALLSTART]
+                if st is not None:
+                    ft = float((r[COL_TODFINISH] - st).timeval)
+                    splits = self.getsplits(r.iter, st)
+                    if ft > 0.0 and splits:
+                        rcat = self.ridercat(riderdb.primary_cat(r[COL_CAT]))
+                        samples.setdefault(rcat, []).append(({
+                            c[0]: c[2]
+                            for c in splits
+                        }, ft))
+        ratios = {}
+        for rcat, cs in samples.items():
+            cr = split_ratios(cs)
+            if cr:
+                ratios[rcat] = cr
+        changed = set()
+        for rcat in set(ratios) | set(self._etaratios):
+            old = self._etaratios.get(rcat, {})
+            new = ratios.get(rcat, {})
+            if old.keys() != new.keys():
+                changed.add(rcat)
+            elif any(abs(new[c] - old[c]) > _ETA_RATIOTOL for c in new):
+                changed.add(rcat)
+        if changed:
+            for rcat in changed:
+                if rcat in ratios:
+                    self._etaratios[rcat] = ratios[rcat]
+                else:
+                    del self._etaratios[rcat]
+            _log.debug('Updated split ratios: %r', self._etaratios)
+            for r in self.riders:
+                rcat = self.ridercat(riderdb.primary_cat(r[COL_CAT]))
+                if rcat in changed:
+                    self._etacache.pop((r[COL_BIB], r[COL_SERIES]), None)
+
     def getfactored(self, iter, factor=None):
         """Return a factored result for an iter"""
         if factor is None:
@@ -530,6 +965,7 @@ class irtt(rms):
 
     def event_ctrl(self, acode='', rlist=''):
         """Apply the selected action to the provided bib list."""
+        self.loadwait()
         if acode in self.intermeds:
             if acode == 'brk':
                 rlist = ' '.join(strops.riderlist_split(rlist))
@@ -555,9 +991,11 @@ class irtt(rms):
             return True
         elif acode == 'add':
             rlist = strops.reformat_bibserlist(rlist)
+            riders = []
             for bibstr in rlist.split():
                 bib, ser = strops.bibstr2bibser(bibstr)
-                self.addrider(bib, ser)
+                riders.append((bib, ser, None))
+            self.addriders(riders)
             return True
         elif acode == 'dnf':
             self.dnfriders(strops.reformat_bibserlist(rlist))
@@ -613,7 +1051,10 @@ class irtt(rms):
         """Load event config from disk."""
         self.ridernos.clear()
         self.riders.clear()
-        self.results = {'': tod.todlist('UNCAT')}
+        self.sched_clear()
+        self.eta_clear()
+        self.arrival_clear()
+        self.results = {'': ranklist('UNCAT')}
         self.cats = []
 
         cr = jsonconfig.config({
@@ -705,12 +1146,12 @@ class irtt(rms):
 
         # add the category result and inter holders
         for cat in self.cats:
-            self.results[cat] = tod.todlist(cat)
-            self.inters[COL_INTERA][cat] = tod.todlist(cat)
-            self.inters[COL_INTERB][cat] = tod.todlist(cat)
-            self.inters[COL_INTERC][cat] = tod.todlist(cat)
-            self.inters[COL_INTERD][cat] = tod.todlist(cat)
-            self.inters[COL_INTERE][cat] = tod.todlist(cat)
+            self.results[cat] = ranklist(cat)
+            self.inters[COL_INTERA][cat] = ranklist(cat)
+            self.inters[COL_INTERB][cat] = ranklist(cat)
+            self.inters[COL_INTERC][cat] = ranklist(cat)
+            self.inters[COL_INTERD][cat] = ranklist(cat)
+            self.inters[COL_INTERE][cat] = ranklist(cat)
 
         # pre-load lap targets
         self.load_cat_data()
@@ -722,76 +1163,16 @@ class irtt(rms):
         self.set_syncstart(cr.get_tod('irtt', 'start'),
                            cr.get_tod('irtt', 'lstart'))
 
-        # re-load starters/results - note this does not support lookup
-        self.onestart = False
-        for rs in cr.get('irtt', 'startlist').split():
-            (r, s) = strops.bibstr2bibser(rs)
-            i = self.addrider(r, s)
-            nr = Gtk.TreeModelRow(self.riders, i)
-            wst = None
-            tst = None
-            ft = None
-            pt = None
-            ima = None
-            imb = None
-            imc = None
-            imd = None
-            ime = None
-            lpass = None
-            seed = 0
-            pcnt = 0
-            if cr.has_option('riders', rs):
-                # bbb.sss = comment,wall_start,...
-                ril = cr.get('riders', rs)  # vec
-                lr = len(ril)
-                if lr > 0:
-                    nr[COL_COMMENT] = ril[0]
-                if lr > 1:
-                    wst = tod.mktod(ril[1])
-                if lr > 2:
-                    tst = tod.mktod(ril[2])
-                if lr > 3:
-                    ft = tod.mktod(ril[3])
-                if lr > 4:
-                    pt = tod.mktod(ril[4])
-                if lr > 6:
-                    ima = tod.mktod(ril[6])
-                if lr > 7:
-                    imb = tod.mktod(ril[7])
-                if lr > 8:
-                    imc = tod.mktod(ril[8])
-                if lr > 9:
-                    imd = tod.mktod(ril[9])
-                if lr > 10:
-                    ime = tod.mktod(ril[10])
-                if lr > 11:
-                    pcnt = strops.confopt_posint(ril[11])
-                if lr > 12:
-                    lpass = tod.mktod(ril[12])
-                if lr > 13:
-                    seed = strops.confopt_posint(ril[13])
-            nri = i
-            self.settimes(nri, wst, tst, ft, pt, doplaces=False)
-            self.setpasses(nri, pcnt)
-            self.setinter(nri, ima, COL_INTERA)
-            self.setinter(nri, imb, COL_INTERB)
-            self.setinter(nri, imc, COL_INTERC)
-            self.setinter(nri, imd, COL_INTERD)
-            self.setinter(nri, ime, COL_INTERE)
-            self.riders.set_value(nri, COL_LASTSEEN, lpass)
-            self.riders.set_value(nri, COL_SEED, seed)
-            # record any extra bonus/penalty to rider model
-            if cr.has_option('stagebonus', rs):
-                nr[COL_BONUS] = cr.get_tod('stagebonus', rs)
-            if cr.has_option('stagepenalty', rs):
-                nr[COL_PENALTY] = cr.get_tod('stagepenalty', rs)
-
+        if self.impulsekeep is None or self.impulsekeep < 1:
+            self.impulsekeep = _IMPULSEKEEP
+        self.startpasses.keep = self.impulsekeep
         self.startpasses.clear()
         fp = cr.get('irtt', 'startpasses')
         if isinstance(fp, list):
             for t in fp:
                 self.startpasses.insert(t)
 
+        self.finishpasses.keep = self.impulsekeep
         self.finishpasses.clear()
         fp = cr.get('irtt', 'finishpasses')
         if isinstance(fp, list):
@@ -816,7 +1197,6 @@ class irtt(rms):
         self.decisions = cr.get('irtt', 'decisions')
         if cr.get_bool('irtt', 'finished'):
             self.set_finished()
-        self.recalculate()
 
         # After load complete - check config and report.
         eid = cr.get_value('irtt', 'id')
@@ -824,11 +1204,88 @@ class irtt(rms):
             _log.info('Event config mismatch: %r != %r', eid, EVENT_ID)
             self.readonly = True
 
+        # re-load starters/results - note this does not support lookup
+        self.onestart = False
+        self.loadriders(cr, cr.get('irtt', 'startlist').split())
+
+    def loadrider(self, cr, rs):
+        """Add rider rs to event and restore saved times from cr."""
+        (r, s) = strops.bibstr2bibser(rs)
+        i = self.addrider(r, s)
+        if i is None:
+            # rider may already be in the event, restore saved values
+            i = self.getiter(r, s)
+            if i is None:
+                return
+        nr = Gtk.TreeModelRow(self.riders, i)
+        wst = None
+        tst = None
+        ft = None
+        pt = None
+        ima = None
+        imb = None
+        imc = None
+        imd = None
+        ime = None
+        lpass = None
+        seed = 0
+        pcnt = 0
+        if cr.has_option('riders', rs):
+            # bbb.sss = comment,wall_start,...
+            ril = cr.get('riders', rs)  # vec
+            lr = len(ril)
+            if lr > 0:
+                nr[COL_COMMENT] = ril[0]
+            if lr > 1:
+                wst = tod.mktod(ril[1])
+            if lr > 2:
+                tst = tod.mktod(ril[2])
+            if lr > 3:
+                ft = tod.mktod(ril[3])
+            if lr > 4:
+                pt = tod.mktod(ril[4])
+            if lr > 6:
+                ima = tod.mktod(ril[6])
+            if lr > 7:
+                imb = tod.mktod(ril[7])
+            if lr > 8:
+                imc = tod.mktod(ril[8])
+            if lr > 9:
+                imd = tod.mktod(ril[9])
+            if lr > 10:
+                ime = tod.mktod(ril[10])
+            if lr > 11:
+                pcnt = strops.confopt_posint(ril[11])
+            if lr > 12:
+                lpass = tod.mktod(ril[12])
+            if lr > 13:
+                seed = strops.confopt_posint(ril[13])
+        nri = i
+        self.settimes(nri, wst, tst, ft, pt, doplaces=False)
+        self.setpasses(nri, pcnt)
+        self.setinter(nri, ima, COL_INTERA)
+        self.setinter(nri, imb, COL_INTERB)
+        self.setinter(nri, imc, COL_INTERC)
+        self.setinter(nri, imd, COL_INTERD)
+        self.setinter(nri, ime, COL_INTERE)
+        self.riders.set_value(nri, COL_LASTSEEN, lpass)
+        self.riders.set_value(nri, COL_SEED, seed)
+        # record any extra bonus/penalty to rider model
+        if cr.has_option('stagebonus', rs):
+            nr[COL_BONUS] = cr.get_tod('stagebonus', rs)
+        if cr.has_option('stagepenalty', rs):
+            nr[COL_PENALTY] = cr.get_tod('stagepenalty', rs)
+
+    def loadfinish(self):
+        """Recalculate once all riders are loaded."""
+        self.recalculate()
+
     def saveconfig(self):
         """Save event to disk."""
         if self.readonly:
             _log.error('Attempt to save readonly event')
             return
+        self.loadwait()
         cw = jsonconfig.config()
         cw.add_section('irtt', _CONFIG_SCHEMA)
         cw.import_section('irtt', self)
@@ -839,11 +1296,11 @@ class irtt(rms):
         # preserve timer info in finish and start passes
         fp = []
         for t in self.startpasses:
-            fp.append(tod.tod(t[0]))
+            fp.append(tod.tod(t))
         cw.set('irtt', 'startpasses', fp)
         fp = []
         for t in self.finishpasses:
-            fp.append(tod.tod(t[0]))
+            fp.append(tod.tod(t))
         cw.set('irtt', 'finishpasses', fp)
 
         # deprecated inters - save with config for now
@@ -970,6 +1427,7 @@ class irtt(rms):
 
     def signon_report(self):
         """Return a signon report."""
+        self.loadwait()
         sec = report.signon_list('signon')
         self.reorder_signon()
         for r in self.riders:
@@ -979,6 +1437,7 @@ class irtt(rms):
 
     def callup_report(self):
         """Return a TT call up report."""
+        self.loadwait()
         self.reorder_callup()
         ret = []
         if len(self.cats) > 1 and not self.onestartlist:
@@ -1070,6 +1529,7 @@ class irtt(rms):
 
     def arrival_report(self):
         """Return an arrival report."""
+        self.loadwait()
         # build aux table
         aux = []
         nowtime = tod.now()
@@ -1079,7 +1539,10 @@ class irtt(rms):
         fromtime = nowtime - to
         totime = nowtime + tod.ONE
         count = 0
-        for r in self.riders:
+        rows = self.arrival_rows(self._arrfin, fromtime, totime)
+        # all riders on course are listed, finishers only within timeout
+        rows.extend(self.arrival_rows(self._arreta))
+        for r in rows:
             if not r[COL_COMMENT]:
                 reta = tod.MAX
                 rarr = tod.MAX
@@ -1171,6 +1634,7 @@ class irtt(rms):
 
     def analysis_report(self):
         """Return split times report."""
+        self.loadwait()
         if self.interlaps:
             return self.laptime_report()
         else:
@@ -1273,6 +1737,7 @@ class irtt(rms):
 
     def camera_report(self):
         """Return a judges report."""
+        self.loadwait()
 
         # build aux table
         aux = []
@@ -1502,6 +1967,7 @@ class irtt(rms):
 
     def result_report(self):
         """Return event result report."""
+        self.loadwait()
         ret = []
         self.recalculate()
 
@@ -1536,6 +2002,7 @@ class irtt(rms):
 
     def startlist_gen(self, cat=''):
         """Generator function to export a startlist."""
+        self.loadwait()
         mcat = self.ridercat(cat)
         # order this export by start time as per callup
         self.reorder_callup()
@@ -1564,6 +2031,7 @@ class irtt(rms):
 
     def result_gen(self, cat=''):
         """Return list of final result."""
+        self.loadwait()
         self.recalculate()
         ret = []
         mcat = self.ridercat(cat)
@@ -1671,6 +2139,7 @@ class irtt(rms):
             _log.info('Intermediate %s: %s %s:%s@%s/%s', label, place, bibstr,
                       e.chan, e.rawtime(2), e.source)
             lr[COL_ETA] = self.geteta(nri)
+            self.arrival_update(lr)
         else:
             _log.info('No match for lap %r intermediate: %s:%s@%s/%s', lap,
                       bibstr, e.chan, e.rawtime(2), e.source)
@@ -1719,6 +2188,7 @@ class irtt(rms):
                     _log.info('Intermediate %s: %s %s:%s@%s/%s', label, place,
                               bibstr, e.chan, e.rawtime(2), e.source)
                     lr[COL_ETA] = self.geteta(nri)
+                    self.arrival_update(lr)
                 else:
                     _log.info('No match for intermediate: %s:%s@%s/%s', bibstr,
                               e.chan, e.rawtime(2), e.source)
@@ -1732,18 +2202,16 @@ class irtt(rms):
 
     def start_strict_impulse(self, t):
         """Set start time by matching impulse to strict start"""
-        for r in self.riders:
-            ws = r[COL_WALLSTART]
-            st = r[COL_TODSTART]
-            if st is None and ws is not None:
-                dt = abs(ws.timeval - t.timeval)
-                if dt < _STARTTHRESH:
-                    bibstr = strops.bibser2bibstr(r[COL_BIB], r[COL_SERIES])
-                    _log.info('Set start time: %s:%s@%s/%s', bibstr, t.chan,
-                              t.rawtime(2), t.source)
-                    i = r.iter
-                    self.settimes(i, tst=t)
-                    break
+        r = None
+        sv = self.sched_nearest(t, _STARTTHRESH)
+        if sv is not None:
+            r = self.getrider(sv[1], sv[2])
+        if r is not None:
+            bibstr = strops.bibser2bibstr(r[COL_BIB], r[COL_SERIES])
+            _log.info('Set start time: %s:%s@%s/%s', bibstr, t.chan,
+                      t.rawtime(2), t.source)
+            i = r.iter
+            self.settimes(i, tst=t)
         else:
             _log.debug('No matching starter for %s@%s/%s', t.chan,
                        t.rawtime(2), t.source)
@@ -1793,53 +2261,81 @@ class irtt(rms):
         return False
 
     def finish_match(self, i, st, e, bibstr):
-        """Find impulse matching this passing"""
+        """Queue passing for assignment to a finish impulse"""
+        bib = self.riders.get_value(i, COL_BIB)
+        series = self.riders.get_value(i, COL_SERIES)
+        for p in self._finpending:
+            if p[1] == bib and p[2] == series:
+                _log.debug('Finish passing already queued for %s', bibstr)
+                return
+        self._finpending.append((e, bib, series, bibstr))
+        if not self._finassign:
+            self._finassign = True
+            GLib.timeout_add(_FINISH_DECIDE, self.finish_assign)
+
+    def finish_assign(self):
+        """Assign queued finish passings to impulses"""
         # finish transponder loop should be positioned around finish switch
-        match = None
-        count = 0
-        for p in reversed(self.finishpasses):
-            oft = abs(e.timeval - p[0].timeval)
-            if e > p[0] and oft > _FINISH_MATCH_THRESH.timeval:
-                break
-            elif oft < _FINISH_MATCH_THRESH:
-                match = p[0]
-                count += 1
-
-        # if rider wheels are overlapped, print a warning
-        if count > 2:
-            _log.warning(
-                'Excess impulses detected for %s @ %s, manual check required',
-                bibstr, e.rawtime(2))
-
-        if match is not None:
-            _log.info(
-                'Set finish time: %s from passing %s:%s@%s/%s, %d matches',
-                match.rawtime(4), bibstr, e.chan, e.rawtime(2), e.source,
-                count)
-            self.settimes(i, tst=st, tft=match)
-        else:
-            _log.warning('No finish match found for passing %s:%s@%s/%s',
-                         bibstr, e.chan, e.rawtime(2), e.source)
+        self._finassign = False
+        pending = sorted(self._finpending, key=lambda p: p[0].timeval)
+        self._finpending = []
+        if not pending:
+            return False
+        thresh = _FINISH_MATCH_THRESH.timeval
+        cands = self.finishpasses.window(pending[0][0].timeval - thresh,
+                                         pending[-1][0].timeval + thresh,
+                                         unmatched=True)
+        res = assign_impulses([p[0] for p in pending], cands, thresh)
+        for p, r in zip(pending, res):
+            e, bib, series, bibstr = p
+            match, conf = r
+            i = self.getiter(bib, series)
+            if i is None:
+                _log.info('Finish passing for removed rider %s', bibstr)
+            elif self.riders.get_value(i, COL_TODFINISH) is not None:
+                _log.info('Finish passing for finished rider %s', bibstr)
+            elif match is not None:
+                _log.info(
+                    'Set finish time: %s from passing %s:%s@%s/%s, '
+                    'confidence %0.2f', match.rawtime(4), bibstr, e.chan,
+                    e.rawtime(2), e.source, conf)
+                if conf < _FINISH_CONFIDENCE:
+                    _log.warning(
+                        'Low confidence finish for %s @ %s, '
+                        'manual check required', bibstr, e.rawtime(2))
+                self.finishpasses.mark(match)
+                self.settimes(i,
+                              tst=self.riders.get_value(i, COL_TODSTART),
+                              tft=match)
+            else:
+                _log.warning(
+                    'No finish match found for passing %s:%s@%s/%s, '
+                    'impulses matched/unmatched: %d/%d', bibstr, e.chan,
+                    e.rawtime(2), e.source, self.finishpasses.matched,
+                    self.finishpasses.unmatched)
+        return False
 
     def start_match(self, i, e, bibstr):
         """Find impulse matching this passing"""
         # start transponder loop must be positioned after start switch
         match = None
-        for p in reversed(self.startpasses):
-            if e > p[0]:
-                # match oldest impulse in threshold window
-                if (e - p[0]) < _START_MATCH_THRESH:
-                    match = p[0]
-                else:
-                    break
+        # match oldest impulse in threshold window
+        cands = self.startpasses.window(
+            e.timeval - _START_MATCH_THRESH.timeval, e.timeval)
+        if cands:
+            match = cands[0]
 
         if match is not None:
             _log.info('Set start time: %s from passing %s:%s@%s/%s',
                       match.rawtime(4), bibstr, e.chan, e.rawtime(2), e.source)
+            self.startpasses.mark(match)
             self.settimes(i, tst=match)
         else:
-            _log.warning('No start match found for passing %s:%s@%s/%s',
-                         bibstr, e.chan, e.rawtime(2), e.source)
+            _log.warning(
+                'No start match found for passing %s:%s@%s/%s, '
+                'impulses matched/unmatched: %d/%d', bibstr, e.chan,
+                e.rawtime(2), e.source, self.startpasses.matched,
+                self.startpasses.unmatched)
 
     def finish_by_rfid(self, lr, e, bibstr):
         if lr[COL_TODFINISH] is not None:
@@ -2134,28 +2630,22 @@ class irtt(rms):
             # may have been made idle above
             if self.sl.getstatus() == 'idle':
                 # is there a rider to go soon
-                for r in self.riders:
-                    ws = r[COL_WALLSTART]
-                    st = r[COL_TODSTART]
-                    if st is None and ws is not None:
-                        if ws > cst and (ws - cst) <= 10:  # before start
-                            # load rider
-                            bib = r[COL_BIB]
-                            ser = r[COL_SERIES]
-                            _log.info('Load starter: %s @ %s', bib,
-                                      ws.rawtime(0))
-                            self.sl.setrider(bib, ser)
-                            self.meet.cmd_announce('startline', bib)
-                            break
-                else:
-                    pass
+                sv = self.sched_next(cst)
+                if sv is not None and sv[0] - cst.timeval <= 10:
+                    # load rider
+                    bib = sv[1]
+                    ser = sv[2]
+                    _log.info('Load starter: %s @ %s', bib,
+                              tod.tod(sv[0]).rawtime(0))
+                    self.sl.setrider(bib, ser)
+                    self.meet.cmd_announce('startline', bib)
         return False
 
     def timeout(self):
         """Update slow changing aspects of event."""
         if not self.winopen:
             return False
-        if self._dorecalc:
+        if self._dorecalc and self._loadstate is None:
             self.recalculate()
             if self.autoexport:
                 GLib.idle_add(self.meet.menu_data_results_cb, None)
@@ -2195,6 +2685,9 @@ class irtt(rms):
 
     def recalculate(self):
         """Recalculator"""
+        self.loadwait()
+        if self._loadstate is not None:
+            return
         try:
             with self.recalclock:
                 self._dorecalc = False
@@ -2225,6 +2718,7 @@ class irtt(rms):
 
     def getrider(self, bib, series=''):
         """Return temporary reference to model row."""
+        self.loadwait()
         ret = None
         for r in self.riders:
             if r[COL_BIB] == bib and r[COL_SERIES] == series:
@@ -2261,26 +2755,40 @@ class irtt(rms):
 
         return ret
 
+    def setstart(self, i, start):
+        """Set advertised start time for the rider at model iter i."""
+        bib = self.riders.get_value(i, COL_BIB)
+        series = self.riders.get_value(i, COL_SERIES)
+        self.riders.set_value(i, COL_WALLSTART, start)
+        self.eta_clear(bib, series)
+        self.sched_update(bib, series, start,
+                          self.riders.get_value(i, COL_TODSTART))
+
     def starttime(self, start=None, bib='', series=''):
         """Adjust start time for the rider."""
-        r = self.getrider(bib, series)
-        if r is not None:
-            r[COL_WALLSTART] = start
+        i = self.getiter(bib, series)
+        if i is not None:
+            self.setstart(i, start)
             _log.debug('Set start time for %s: %s',
                        strops.bibser2bibstr(bib, series), start.rawtime(0))
             #self.unstart(bib, series, wst=start)
 
     def delrider(self, bib='', series=''):
         """Delete the specified rider from the event model."""
+        self.loadwait()
         i = self.getiter(bib, series)
         if i is not None:
             self.settimes(i)
             self.riders.remove(i)
+        self.sched_update(bib, series)
+        self.eta_clear(bib, series)
+        self.arrival_remove(bib, series)
         if (bib, series) in self.ridernos:
             self.ridernos.remove((bib, series))
 
     def addrider(self, bib='', series=''):
         """Add specified rider to event model."""
+        self.loadwait()
         if bib and (bib, series) in self.ridernos:
             return None
 
@@ -2305,6 +2813,7 @@ class irtt(rms):
                 # if cat is a result category in this event
                 if self.ridercat(rider[0]):
                     self.load_cat_data()
+                    self.eta_clear()
             else:
                 bib = rider[0]
                 series = rider[1]
@@ -2318,6 +2827,7 @@ class irtt(rms):
         else:
             _log.debug('Update all cats')
             self.load_cat_data()
+            self.eta_clear()
             _log.debug('Update all riders')
             count = 0
             for lr in self.riders:
@@ -2334,6 +2844,8 @@ class irtt(rms):
     def updaterider(self, lr, r):
         """Update the local record lr with data from riderdb handle r"""
         lr[COL_NAMESTR] = r.listname()
+        if lr[COL_CAT] != r['cat']:
+            self.eta_clear(lr[COL_BIB], lr[COL_SERIES])
         lr[COL_CAT] = r['cat']
         lr[COL_SHORTNAME] = r.fitname(24)
 
@@ -2346,6 +2858,7 @@ class irtt(rms):
         new_text = ' '.join(new_text.strip().upper().split())
         self.riders[path][col] = new_text
         r = self.riders[path]
+        self.eta_clear(r[COL_BIB], r[COL_SERIES])
         dbr = self.meet.rdb.get_rider(r[COL_BIB], r[COL_SERIES])
         if dbr is not None:
             # note: this will generate a rider change callback
@@ -2419,12 +2932,14 @@ class irtt(rms):
         self.racestat = 'prerace'
         fullcnt = len(self.riders)
         placed = 0
+        self.eta_fit()
         for r in self.riders:
             if r[COL_PLACE] and r[COL_PLACE] in ('dns', 'dnf', 'dsq'):
                 r[COL_ETA] = None
             else:
                 i = r.iter
                 r[COL_ETA] = self.geteta(i)
+            self.arrival_update(r)
             if r[COL_PLACE]:
                 placed += 1
         _log.debug('placed = ' + str(placed) + ', total = ' + str(fullcnt))
@@ -2501,6 +3016,7 @@ class irtt(rms):
 
         # clear result for this bib
         res.remove(bib, series)
+        self.eta_clear(bib, series)
 
         # save intermed tod to rider model
         self.riders.set_value(iter, inter, imed)
@@ -2520,6 +3036,121 @@ class irtt(rms):
                            strops.bibser2bibstr(bib, series))
         return ret
 
+    def arrival_clear(self):
+        """Remove all entries from the arrival indexes."""
+        self._arrfin = []
+        self._arreta = []
+        self._arrkeys = {}
+
+    def _arrival_unindex(self, rk):
+        """Remove rider key rk from the arrival indexes."""
+        ok = self._arrkeys.pop(rk, None)
+        if ok is not None:
+            index = ok[1]
+            idx = bisect_left(index, ok[2])
+            if idx < len(index) and index[idx] == ok[2]:
+                del index[idx]
+
+    def arrival_update(self, r):
+        """Update arrival index entries for rider model row r.
+
+        Finished riders are indexed by finish time of day. Riders on
+        course are indexed by projected arrival, or by their show
+        intermediate time of day if there is no projection.
+        """
+        rk = (r[COL_BIB], r[COL_SERIES])
+        nk = None
+        st = r[COL_TODSTART]
+        if st is None:
+            st = r[COL_WALLSTART]
+        if r[COL_TODFINISH] is not None:
+            nk = (self._arrfin, (r[COL_TODFINISH].timeval, rk[0], rk[1]))
+        elif st is not None:
+            at = None
+            if r[COL_ETA] is not None:
+                at = r[COL_ETA] + st
+            elif self.showinter in self.ischem:
+                at = r[self.showinter]
+            if at is not None:
+                nk = (self._arreta, (at.timeval, rk[0], rk[1]))
+        ok = self._arrkeys.get(rk)
+        if ok is not None and nk is not None:
+            if ok[1] is nk[0] and ok[2] == nk[1]:
+                return
+        self._arrival_unindex(rk)
+        if nk is not None:
+            insort(nk[0], nk[1])
+            self._arrkeys[rk] = (r.iter, nk[0], nk[1])
+
+    def arrival_remove(self, bib, series=''):
+        """Remove rider from the arrival indexes."""
+        self._arrival_unindex((bib, series))
+
+    def arrival_rows(self, index, lo=None, hi=None):
+        """Return model rows in index with time strictly between lo and hi.
+
+        If lo or hi is None, the range is open at that end.
+        """
+        ret = []
+        i = 0
+        if lo is not None:
+            i = bisect_left(index, (lo.timeval, ))
+            while i < len(index) and index[i][0] == lo.timeval:
+                i += 1
+        j = len(index)
+        if hi is not None:
+            j = bisect_left(index, (hi.timeval, ), i)
+        for key in index[i:j]:
+            ok = self._arrkeys.get((key[1], key[2]))
+            if ok is not None:
+                ret.append(self.riders[ok[0]])
+        return ret
+
+    def sched_clear(self):
+        """Remove all entries from the start schedule."""
+        self._sched = []
+        self._schedkeys = {}
+
+    def sched_update(self, bib, series='', wst=None, tst=None):
+        """Update rider's start schedule entry.
+
+        Riders with a wall start and no recorded start time
+        are kept in the schedule, ordered by wall start.
+        """
+        rk = (bib, series)
+        ok = self._schedkeys.pop(rk, None)
+        if ok is not None:
+            idx = bisect_left(self._sched, ok)
+            if idx < len(self._sched) and self._sched[idx] == ok:
+                del self._sched[idx]
+        if wst is not None and tst is None:
+            nk = (wst.timeval, bib, series)
+            insort(self._sched, nk)
+            self._schedkeys[rk] = nk
+
+    def sched_next(self, after):
+        """Return the first schedule entry strictly after the given tod."""
+        ret = None
+        idx = bisect_left(self._sched, (after.timeval, ))
+        while idx < len(self._sched):
+            if self._sched[idx][0] > after.timeval:
+                ret = self._sched[idx]
+                break
+            idx += 1
+        return ret
+
+    def sched_nearest(self, t, thresh):
+        """Return the schedule entry closest to t within thresh seconds."""
+        ret = None
+        idx = bisect_left(self._sched, (t.timeval, ))
+        best = thresh
+        for sv in self._sched[max(0, idx - 1):idx + 1]:
+            dt = abs(sv[0] - t.timeval)
+            if dt < best:
+                best = dt
+                ret = sv
+        return ret
+
     def setpasses(self, iter, passes=None):
         """Set rider pass count."""
         self.riders.set_value(iter, COL_PASS, passes)
@@ -2541,6 +3172,7 @@ class irtt(rms):
 
         # clear result for this bib
         self.results[cat].remove(bib, series)
+        self.eta_clear(bib, series)
 
         # assign tods
         if wst is not None:  # Don't clear a set wall start time!
@@ -2552,6 +3184,7 @@ class irtt(rms):
         oft = self.riders.get_value(iter, COL_TODFINISH)
         self.riders.set_value(iter, COL_TODSTART, tst)
         self.riders.set_value(iter, COL_TODFINISH, tft)
+        self.sched_update(bib, series, wst, tst)
 
         if pt is not None:  # Don't clear penalty either
             self.riders.set_value(iter, COL_TODPENALTY, pt)
@@ -2856,6 +3489,8 @@ class irtt(rms):
             self.settimes(i)  # clear times
             if self.riders.remove(i):
                 pass  # re-select?
+            self.sched_update(bib, series)
+            self.arrival_remove(bib, series)
             if (bib, series) in self.ridernos:
                 self.ridernos.remove((bib, series))
 
@@ -2884,6 +3519,7 @@ class irtt(rms):
 
         self.recalclock = threading.Lock()
         self._dorecalc = False
+        self._loadstate = None
 
         # properties
         self.strictstart = True
@@ -2920,14 +3556,23 @@ class irtt(rms):
         self.startgap = None
         self.cats = []  # the ordered list of cats for results
         self.autocats = False
-        self.startpasses = tod.todlist('start')
-        self.finishpasses = tod.todlist('finish')
-        self.results = {'': tod.todlist('UNCAT')}
+        self.impulsekeep = _IMPULSEKEEP
+        self.startpasses = impulses('start')
+        self.finishpasses = impulses('finish')
+        self._etacache = {}  # (bib, series): (meet distance, eta, dist)
+        self._etaratios = {}  # cat: {inter col: split to finish ratio}
+        self._etadirty = True  # re-fit split ratios on next recalculate
+        self._arrfin = []  # ordered (finish, bib, series) of finished riders
+        self._arreta = []  # ordered (arrival, bib, series) of riders on course
+        self._arrkeys = {}  # map of (bib, series) to (iter, index, entry)
+        self._finpending = []  # finish passings waiting for assignment
+        self._finassign = False
+        self.results = {'': ranklist('UNCAT')}
         self.inters = {}
         self.ischem = {}
         self.showinter = None
         for im in (COL_INTERA, COL_INTERB, COL_INTERC, COL_INTERD, COL_INTERE):
-            self.inters[im] = {'': tod.todlist('UNCAT')}
+            self.inters[im] = {'': ranklist('UNCAT')}
             self.ischem[im] = None
         self.interloops = {}  # map of loop ids to inter splits
         self.interlaps = {}  # map of lap counts to inter splits
@@ -2955,6 +3600,8 @@ class irtt(rms):
         self.tallymap = {}  # map of tally keys
 
         self.ridernos = set()
+        self._sched = []  # ordered (wallstart, bib, series) of non-starters
+        self._schedkeys = {}  # map of (bib, series) to schedule entry
         self.riders = Gtk.ListStore(
             str,  # bib 0
             str,  # namestr 1
@@ -6,6 +6,7 @@ import gi
 import logging
 import threading
 import bisect
+from collections import deque
 
 gi.require_version("GLib", "2.0")
 from gi.repository import GLib
@@ -21,10 +22,11 @@ from metarace import tod
 from metarace import riderdb
 from metarace import strops
 from metarace import countback
-from metarace import report
 from metarace import jsonconfig
 from . import uiutil
 
+report = uiutil.lazymodule('metarace.report')
+
 _log = logging.getLogger('rms')
 _log.setLevel(logging.DEBUG)
 
@@ -109,6 +111,7 @@ DNFCODES = ['otl', 'wd', 'dsq', 'dnf', 'dns']
 GAPTHRESH = tod.tod('1.12')
 MINPASSTIME = tod.tod(20)
 MAXELAP = tod.tod('12h00:00')
+LOADCHUNK = 50  # riders restored per main loop iteration on event load
 
 # timing keys
 key_announce = 'F4'
@@ -495,52 +498,6 @@ class rms:
         # restore stage inters, points and bonuses
         self.loadstageinters(cr, 'rms')
 
-        # load competitors
-        starters = strops.riderlist_split(
-            cr.get('rms', 'startlist').upper().strip(), self.meet.rdb)
-
-        onestoft = False
-        oneseed = False
-        for r in starters:
-            ri = self.addrider(r)
-            if ri is not None:
-                nr = Gtk.TreeModelRow(self.riders, ri)
-                if cr.has_option('riders', r):
-                    # bib = comment,in,laps,rftod,mbunch,rfseen...
-                    ril = cr.get('riders', r)  # rider op is vec
-                    lr = len(ril)
-                    if lr > 0:
-                        nr[COL_COMMENT] = ril[0]
-                    if lr > 1:
-                        nr[COL_INRACE] = strops.confopt_bool(ril[1])
-                    if lr > 2:
-                        nr[COL_LAPS] = strops.confopt_posint(ril[2])
-                        nr[COL_LAPCOLOUR] = self.bgcolour(nr[COL_LAPS])
-                    if lr > 3:
-                        evtseed = strops.confopt_posint(ril[3], 0)
-                        if evtseed > 0:
-                            nr[COL_SEED] = evtseed
-                        if nr[COL_SEED] != 0:
-                            oneseed = True
-                    if lr > 4:
-                        nr[COL_RFTIME] = tod.mktod(ril[4])
-                    if lr > 5:
-                        nr[COL_MBUNCH] = tod.mktod(ril[5])
-                    if lr > 6:
-                        nr[COL_STOFT] = tod.mktod(ril[6])
-                        if nr[COL_STOFT] is not None:
-                            onestoft = True
-                    if lr > 7:
-                        for i in range(7, lr):
-                            laptod = tod.mktod(ril[i])
-                            if laptod is not None:
-                                nr[COL_RFSEEN].append(laptod)
-                # record any extra bonus/penalty to rider model
-                if cr.has_option('stagebonus', r):
-                    nr[COL_BONUS] = cr.get_tod('stagebonus', r)
-                if cr.has_option('stagepenalty', r):
-                    nr[COL_PENALTY] = cr.get_tod('stagepenalty', r)
-
         self.laptimes = cr.get('rms', 'laptimes')
         self.set_start(cr.get_tod('rms', 'start'))
         self.set_finish(cr.get_tod('rms', 'finish'))
@@ -554,7 +511,6 @@ class rms:
         self.decisions = cr.get('rms', 'decisions')
         if cr.get_bool('rms', 'finished'):
             self.set_finished()
-        self.recalculate()
 
         self.hidecols = cr.get('rms', 'hidecols')
         for col in self.hidecols:
@@ -562,23 +518,8 @@ class rms:
             if target is not None:
                 self.hidecolumn(target)
 
-        # load starts and targets and then handle lap situation
+        # load starts and targets
         self.load_cat_data()
-        if self.etype != 'handicap':
-            for c in self.catstarts:
-                if self.catstarts[c] is not None:
-                    onestoft = True
-        else:
-            # don't autohide the start column for handicaps
-            onestoft = True
-
-        # auto-hide the start column
-        if not onestoft:
-            self.hidecolumn(STARTCOLUMN)
-
-        # auto-hide the seed column
-        if not oneseed:
-            self.hidecolumn(SEEDCOLUMN)
 
         if self.curlap is not None and self.curlap >= 0:
             self.lapentry.set_text(str(self.curlap))
@@ -598,6 +539,189 @@ class rms:
             _log.info('Event config mismatch: %r != %r', eid, EVENT_ID)
             self.readonly = True
 
+        # restore competitors, then recalculate
+        starters = strops.riderlist_split(
+            cr.get('rms', 'startlist').upper().strip(), self.meet.rdb)
+        self.loadriders(cr, starters)
+
+    def loadriders(self, cr, riders):
+        """Restore riders from config, then complete the event load.
+
+        With a ui, rows are restored in chunks from the main loop and
+        timer events are held until the load is complete.
+        """
+        self.loadcancel()
+        self._loadstate = {
+            'cr': cr,
+            'riders': deque(riders),
+            'hold': False,
+            'busy': False,
+            'held': [],
+            'timercb': None,
+            'alttimercb': None,
+        }
+        _log.debug('Loading %d riders', len(self._loadstate['riders']))
+        if self.readonly:
+            self.loadwait()
+        else:
+            self._loadstate['hold'] = True
+            self._loadstate['timercb'] = self.meet.timercb
+            self._loadstate['alttimercb'] = self.meet.alttimercb
+            self.meet.timercb = self._loadtimercb
+            self.meet.alttimercb = self._loadalttimercb
+            GLib.idle_add(self.loadchunk)
+
+    def _loadtimercb(self, e):
+        """Hold a transponder event until load is complete."""
+        if self._loadstate is not None:
+            self._loadstate['held'].append(('timercb', e))
+        return False
+
+    def _loadalttimercb(self, e):
+        """Hold a chronometer event until load is complete."""
+        if self._loadstate is not None:
+            self._loadstate['held'].append(('alttimercb', e))
+        return False
+
+    def loadchunk(self):
+        """Restore a chunk of riders, return True if more remain."""
+        ls = self._loadstate
+        if ls is None:
+            return False
+        if ls['busy']:
+            # entry point called from within a chunk
+            return False
+        cr = ls['cr']
+        riders = ls['riders']
+        count = 0
+        ls['busy'] = True
+        try:
+            while riders and count < LOADCHUNK:
+                self.loadrider(cr, riders.popleft())
+                count += 1
+        finally:
+            ls['busy'] = False
+        if riders:
+            return True
+
+        self._loadstate = None
+        self.loadfinish()
+        self._loadrelease(ls)
+        if ls['held']:
+            _log.debug('Replay %d held timer events', len(ls['held']))
+        for cb, e in ls['held']:
+            if ls[cb] is not None:
+                ls[cb](e)
+        _log.debug('Event load complete')
+        return False
+
+    def _loadrelease(self, ls):
+        """Return timer callbacks held by load state ls to the meet."""
+        if not ls['hold']:
+            return
+        if self.meet.timercb == self._loadtimercb:
+            self.meet.timercb = ls['timercb']
+        if self.meet.alttimercb == self._loadalttimercb:
+            self.meet.alttimercb = ls['alttimercb']
+
+    def loadcancel(self):
+        """Abandon any pending rider load and discard held events."""
+        ls = self._loadstate
+        self._loadstate = None
+        if ls is not None:
+            _log.debug('Cancelled event load with %d riders pending',
+                       len(ls['riders']))
+            self._loadrelease(ls)
+
+    def loadwait(self):
+        """Complete any pending rider load immediately."""
+        while self.loadchunk():
+            pass
+
+    def loadrider(self, cr, r):
+        """Add rider r to event and restore saved values from cr."""
+        ri = self.addrider(r)
+        if ri is None:
+            # rider may already be in the event, restore saved values
+            ri = self.getiter(r, self.series)
+            if ri is None:
+                return
+        cols = []
+        vals = []
+        if cr.has_option('riders', r):
+            # bib = comment,in,laps,rftod,mbunch,rfseen...
+            ril = cr.get('riders', r)  # rider op is vec
+            lr = len(ril)
+            if lr > 0:
+                cols.append(COL_COMMENT)
+                vals.append(ril[0])
+            if lr > 1:
+                cols.append(COL_INRACE)
+                vals.append(strops.confopt_bool(ril[1]))
+            if lr > 2:
+                laps = strops.confopt_posint(ril[2])
+                cols.extend((COL_LAPS, COL_LAPCOLOUR))
+                vals.extend((laps, self.bgcolour(laps)))
+            if lr > 3:
+                evtseed = strops.confopt_posint(ril[3], 0)
+                if evtseed > 0:
+                    cols.append(COL_SEED)
+                    vals.append(evtseed)
+            if lr > 4:
+                cols.append(COL_RFTIME)
+                vals.append(tod.mktod(ril[4]))
+            if lr > 5:
+                cols.append(COL_MBUNCH)
+                vals.append(tod.mktod(ril[5]))
+            if lr > 6:
+                cols.append(COL_STOFT)
+                vals.append(tod.mktod(ril[6]))
+            if lr > 7:
+                # passings are decoded only as their row is restored
+                seen = []
+                for i in range(7, lr):
+                    laptod = tod.mktod(ril[i])
+                    if laptod is not None:
+                        seen.append(laptod)
+                cols.append(COL_RFSEEN)
+                vals.append(seen)
+        # record any extra bonus/penalty to rider model
+        if cr.has_option('stagebonus', r):
+            cols.append(COL_BONUS)
+            vals.append(cr.get_tod('stagebonus', r))
+        if cr.has_option('stagepenalty', r):
+            cols.append(COL_PENALTY)
+            vals.append(cr.get_tod('stagepenalty', r))
+        if cols:
+            self.riders.set(ri, cols, vals)
+
+    def loadfinish(self):
+        """Recalculate and update columns once all riders are loaded."""
+        self.recalculate()
+
+        onestoft = False
+        oneseed = False
+        for r in self.riders:
+            if r[COL_STOFT] is not None:
+                onestoft = True
+            if r[COL_SEED] != 0:
+                oneseed = True
+        if self.etype != 'handicap':
+            for c in self.catstarts:
+                if self.catstarts[c] is not None:
+                    onestoft = True
+        else:
+            # don't autohide the start column for handicaps
+            onestoft = True
+
+        # auto-hide the start column
+        if not onestoft:
+            self.hidecolumn(STARTCOLUMN)
+
+        # auto-hide the seed column
+        if not oneseed:
+            self.hidecolumn(SEEDCOLUMN)
+
     def get_ridercmdorder(self):
         """Return rider command list order."""
         ret = RIDER_COMMANDS_ORD[0:]
@@ -634,6 +758,7 @@ class rms:
 
     def get_catlist(self):
         """Return the ordered list of categories."""
+        self.loadwait()
         rvec = []
         for cat in self.cats:
             if cat != '':
@@ -697,6 +822,7 @@ class rms:
         if self.readonly:
             _log.error('Attempt to save readonly event')
             return
+        self.loadwait()
         cw = jsonconfig.config()
         cw.add_section('rms', _CONFIG_SCHEMA)
         cw.import_section('rms', self)
@@ -786,12 +912,15 @@ class rms:
 
     def destroy(self):
         """Emit destroy signal to event handler."""
+        # complete load so that shutdown saves all riders
+        self.loadwait()
         if self.context_menu is not None:
             self.context_menu.destroy()
         self.frame.destroy()
 
     def points_report(self):
         """Return the points tally report."""
+        self.loadwait()
         ret = []
         cnt = 0
         for tally in self.tallys:
@@ -898,6 +1027,7 @@ class rms:
 
     def signon_report(self):
         """Return a signon report."""
+        self.loadwait()
         ret = []
         self.reorder_startlist()
         if len(self.cats) > 1:
@@ -946,6 +1076,7 @@ class rms:
 
     def callup_report(self):
         """Return a callup report."""
+        self.loadwait()
         # Note: this is just a startlist with different ordering and ranks
         ret = []
         self.reorder_startlist(callup=True)
@@ -961,6 +1092,7 @@ class rms:
 
     def startlist_report(self):
         """Return a startlist report."""
+        self.loadwait()
         ret = []
         self.reorder_startlist()
         if len(self.cats) > 1:
@@ -1177,6 +1309,7 @@ class rms:
 
     def analysis_report(self):
         """Return an analysis report."""
+        self.loadwait()
         if self.etype in ('cross', 'circuit', 'trtt'):
             return self.laptime_report()
         else:
@@ -1184,6 +1317,7 @@ class rms:
 
     def camera_report(self, title='Judges Report', mode='judging'):
         """Return the judges (camera) report."""
+        self.loadwait()
         # Note: camera report treats all riders as a single blob
         ret = []
         self.recalculate()  # fill places and bunch info
@@ -1400,6 +1534,7 @@ class rms:
 
     def arrival_report(self):
         """Return riders arriving at finish"""
+        self.loadwait()
         sec = report.section('arrivals')
         return (sec, )
 
@@ -1782,6 +1917,7 @@ class rms:
 
     def result_report(self):
         """Return a result report."""
+        self.loadwait()
         ret = []
         self.recalculate()
 
@@ -2087,8 +2223,7 @@ class rms:
     def event_ctrl_add(self, rlist):
         """Add the supplied riders to event model with lookup"""
         rlist = strops.riderlist_split(rlist, self.meet.rdb, self.series)
-        for bib in rlist:
-            self.addrider(bib)
+        self.addriders([(bib, None, None) for bib in rlist])
         return True
 
     def event_ctrl_del(self, rlist):
@@ -2100,6 +2235,7 @@ class rms:
 
     def event_ctrl(self, acode='', rlist=''):
         """Apply the selected action to the provided bib list."""
+        self.loadwait()
         if acode in self.intermeds:
             if acode == 'brk':
                 rlist = ' '.join(strops.riderlist_split(rlist))
@@ -2199,6 +2335,7 @@ class rms:
 
     def startlist_gen(self, cat=''):
         """Generator function to export a startlist."""
+        self.loadwait()
         mcat = self.ridercat(cat)
         self.reorder_startlist()
         for r in self.riders:
@@ -2230,6 +2367,7 @@ class rms:
 
     def lifexport(self):
         """Export lif."""
+        self.loadwait()
         self.recalculate()
         st = tod.ZERO
         if self.start is not None:
@@ -2281,6 +2419,7 @@ class rms:
            - Cross type adjusts time to include cat leader's average
              lap time and time down at finish
         """
+        self.loadwait()
         self.recalculate()
         mcat = self.ridercat(cat)
         rcount = 0
@@ -2398,6 +2537,7 @@ class rms:
 
     def getrider(self, bib, series=''):
         """Return reference to selected rider no."""
+        self.loadwait()
         ret = None
         if series == self.series:
             for r in self.riders:
@@ -2419,6 +2559,7 @@ class rms:
 
     def delrider(self, bib='', series=''):
         """Remove the specified rider from the model."""
+        self.loadwait()
         if series == self.series:
             self.clear_place(bib)
             i = self.getiter(bib, series)
@@ -2433,8 +2574,37 @@ class rms:
             if r is not None:
                 r[COL_STOFT] = start
 
+    def setstart(self, i, start):
+        """Set start time for the rider at model iter i."""
+        self.riders.set_value(i, COL_STOFT, start)
+
+    def addriders(self, riders):
+        """Add (bib, series, start) entries to event model, return count.
+
+        Rows are appended with the model detached from its view, and
+        the event is recalculated once all riders are added.
+        """
+        self.loadwait()
+        count = 0
+        self.view.set_model(None)
+        try:
+            for bib, series, start in riders:
+                i = self.addrider(bib, series)
+                if i is not None:
+                    count += 1
+                    if start is not None:
+                        self.setstart(i, start)
+                elif start is not None:
+                    self.starttime(start, bib, series)
+        finally:
+            self.view.set_model(self.riders)
+        _log.debug('Added %d riders', count)
+        self.recalculate()
+        return count
+
     def addrider(self, bib='', series=None):
         """Add specified rider to event model, return tree iter."""
+        self.loadwait()
         if series is not None and series != self.series:
             _log.debug('Ignoring non-series rider: %s',
                        strops.bibser2bibstr(bib, series))
@@ -3573,7 +3743,7 @@ class rms:
         """Update elapsed time and recalculate if required."""
         if not self.winopen:
             return False
-        if self._dorecalc:
+        if self._dorecalc and self._loadstate is None:
             self.recalculate()
             if self.autoexport:
                 GLib.idle_add(self.meet.menu_data_results_cb, None)
@@ -3852,6 +4022,7 @@ class rms:
 
     def addcat(self, cat, reload=True):
         """Add category to event result"""
+        self.loadwait()
         cat = cat.upper()
         if cat not in self.cats:
             self.cats.remove('')
@@ -3864,6 +4035,7 @@ class rms:
 
     def delcat(self, cat, reload=True):
         """Remove category from event result"""
+        self.loadwait()
         cat = cat.upper()
         if cat in self.cats:
             self.cats.remove('')
@@ -3877,6 +4049,7 @@ class rms:
 
     def changecat(self, oldcat, newcat, reload=True):
         """Alter category code event result"""
+        self.loadwait()
         oldcat = oldcat.upper()
         newcat = newcat.upper()
         if oldcat in self.cats:
@@ -4116,6 +4289,9 @@ class rms:
 
     def recalculate(self):
         """Recalculator"""
+        self.loadwait()
+        if self._loadstate is not None:
+            return
         try:
             with self.recalclock:
                 self._dorecalc = False
@@ -4989,6 +5165,7 @@ class rms:
 
         self.recalclock = threading.Lock()
         self._dorecalc = False
+        self._loadstate = None
 
         # event run time attributes
         self.calcset = False
@@ -15,12 +15,13 @@ import metarace
 from metarace import tod
 from metarace import riderdb
 from metarace import strops
-from metarace import report
 from metarace import jsonconfig
 from . import uiutil
 
 from roadmeet.rms import rms, RESERVED_SOURCES, GAPTHRESH
 
+report = uiutil.lazymodule('metarace.report')
+
 _log = logging.getLogger('trtt')
 _log.setLevel(logging.DEBUG)
 
@@ -205,41 +206,61 @@ _CONFIG_SCHEMA = {
 
 class trtt(rms):
 
-    def team_start_times(self):
-        """Scan riders and patch start times from team entry."""
-        self.teamnames = {}
-        self.teamclass = {}
-        teamstarts = {}
+    def load_team(self, nt, cat='', bib=None):
+        """Read team nt from riderdb into the team metadata cache."""
+        tm = {'name': nt, 'class': '', 'start': None, 'cat': cat}
+        dbr = self.meet.rdb.get_rider(nt, 'team')
+        if dbr is not None:
+            tm['start'] = tod.mktod(dbr['refid'])
+            tm['name'] = dbr['first']
+            tm['class'] = dbr['class']
+        elif bib is not None:
+            _log.warning('No team entry found for %r (rider: %s)', nt, bib)
+        self.teammeta[nt] = tm
+        self.teamnames[nt] = tm['name']
+        self.teamclass[nt] = tm['class']
+        return tm
+
+    def team_meta(self, nt):
+        """Return cached name, class, start and cat for team nt."""
+        tm = self.teammeta.get(nt)
+        if tm is None:
+            tm = self.load_team(nt)
+        return tm
+
+    def team_start_times(self, team=None):
+        """Scan riders and patch start times from team entry.
+
+        If team is provided, only that team is re-read from riderdb.
+        """
+        if team is None:
+            self.teammeta = {}
+            self.teamnames = {}
+            self.teamclass = {}
+        else:
+            self.teammeta.pop(team, None)
         # pass 1: extract team times and names
+        loaded = set()
         for r in self.riders:
             nt = r[COL_TEAM]
-            if nt not in teamstarts:
-                teamClass = ''
-                teamName = nt
-                st = tod.ZERO
-                dbr = self.meet.rdb.get_rider(nt, 'team')
-                if dbr is not None:
-                    st = tod.mktod(dbr['refid'])
-                    teamName = dbr['first']
-                    teamClass = dbr['class']
-                else:
-                    _log.warning('No team entry found for %r (rider: %s)', nt,
-                                 r[COL_BIB])
-                self.teamnames[nt] = teamName
-                self.teamclass[nt] = teamClass
-                teamstarts[nt] = st
+            if nt not in loaded and (team is None or nt == team):
+                cat = self.ridercat(riderdb.primary_cat(r[COL_CAT]))
+                self.load_team(nt, cat, r[COL_BIB])
+                loaded.add(nt)
 
         # pass 2: patch start times if present
         cnt = 0
         for r in self.riders:
             nt = r[COL_TEAM]
-            if nt in teamstarts and teamstarts[nt]:
-                r[COL_STOFT] = teamstarts[nt]
-                cnt += 1
-            else:
-                r[COL_STOFT] = tod.ZERO
-                _log.warning('No start time for %s:%s', r[COL_TEAM],
-                             r[COL_BIB])
+            if nt in loaded:
+                st = self.teammeta[nt]['start']
+                if st:
+                    r[COL_STOFT] = st
+                    cnt += 1
+                else:
+                    r[COL_STOFT] = tod.ZERO
+                    _log.warning('No start time for %s:%s', r[COL_TEAM],
+                                 r[COL_BIB])
         _log.debug('Patched %r start times', cnt)
 
     def loadconfig(self):
@@ -499,6 +520,7 @@ class trtt(rms):
 
     def callup_report(self):
         """Return a start order report."""
+        self.loadwait()
         # This is time trial - so generate a time specific startlist
         ret = []
         cnt = self.reorder_startlist()
@@ -521,9 +543,7 @@ class trtt(rms):
             if rteam != lteam:  # issue team time
                 cs = r[COL_CAT]
                 tcat = self.ridercat(riderdb.primary_cat(cs))
-                dbr = self.meet.rdb.get_rider(rteam, 'team')
-                if dbr is not None:
-                    tcls = dbr['class']
+                tcls = self.team_meta(rteam)['class']
                 if not tcls and tcat == '':
                     tcls = cs
                 if lcat != tcat:
@@ -549,9 +569,7 @@ class trtt(rms):
                             sec.footer = footer
                 lcat = tcat
 
-                tname = rteam  # use key and only replace if avail
-                if rteam in self.teamnames:
-                    tname = self.teamnames[rteam]
+                tname = self.team_meta(rteam)['name']
                 if ltod is not None and rstart - ltod > self.startgap:
                     sec.lines.append([])
                 ltod = rstart
@@ -633,6 +651,7 @@ class trtt(rms):
 
     def camera_report(self):
         """Return the judges (camera) report."""
+        self.loadwait()
         # Note: camera report treats all riders as a single blob
         # TODO: Repair laplines
         ret = []
@@ -873,11 +892,12 @@ class trtt(rms):
                         # this team has a finish time
                         finCnt += 1
                         auxTime = self.teamtimes[rteam]
-                        tcls = self.teamclass[rteam]
+                        tm = self.team_meta(rteam)
+                        tcls = tm['class']
                         teamAux.append((auxTime, teamCnt, rteam))
                         teamRes[rteam]['time'] = auxTime
                         teamRes[rteam]['tline'] = [
-                            None, rteam, self.teamnames[rteam], tcls,
+                            None, rteam, tm['name'], tcls,
                             auxTime.rawtime(1), ''
                         ]
                 rTime = ''
@@ -987,6 +1007,7 @@ class trtt(rms):
 
     def result_report(self):
         """Return event result report"""
+        self.loadwait()
         ret = []
         self.recalculate()
 
@@ -1007,8 +1028,7 @@ class trtt(rms):
     def event_ctrl_add(self, rlist):
         """Add the supplied riders to event model with lookup"""
         rlist = strops.riderlist_split(rlist, self.meet.rdb, self.series)
-        for bib in rlist:
-            self.addrider(bib)
+        self.addriders([(bib, None, None) for bib in rlist])
         self.team_start_times()
         return True
 
@@ -1022,6 +1042,7 @@ class trtt(rms):
 
     def startlist_gen(self, cat=''):
         """Generator function to export a startlist."""
+        self.loadwait()
         mcat = self.ridercat(cat)
         self.reorder_startlist()
         eventStart = tod.ZERO
@@ -1054,6 +1075,7 @@ class trtt(rms):
 
     def result_gen(self, cat=''):
         """Generator function to export a final result."""
+        self.loadwait()
         # in TTT stage ranks are based on individual elapsed time,
         # and will be incomplete until all riders are confirmed
         self.recalculate()
@@ -1119,6 +1141,7 @@ class trtt(rms):
 
     def addrider(self, bib='', series=None):
         """Add specified rider to event model, return tree iter."""
+        self.loadwait()
         if series is not None and series != self.series:
             _log.debug('Ignoring non-series rider: %r',
                        strops.bibser2bibstr(bib, series))
@@ -1155,8 +1178,12 @@ class trtt(rms):
 
     def updateteam(self, team=None):
         """Handle a change in team data"""
-        # assume the worst and recalc all riders
-        self.team_start_times()
+        if team is not None and team[1] == 'team':
+            # refresh just the changed team entry
+            self.team_start_times(team[0].upper())
+        else:
+            # rider change may alter team membership, recalc all riders
+            self.team_start_times()
 
     def resettimer(self):
         """Reset event timer."""
@@ -1164,6 +1191,8 @@ class trtt(rms):
         self.set_start()
         self.clear_results()
         self.teamtimes = {}
+        self.teammap = {}
+        self._teamsig = {}
         self.timerstat = 'idle'
         self.meet.cmd_announce('timerstat', 'idle')
         self.meet.stat_but.update('idle', 'Idle')
@@ -1362,12 +1391,8 @@ class trtt(rms):
     def bounceteam(self, team, cat, time):
         """Bounce a teamname and time onto the panel"""
         team = team.upper()
-        tname = ''
         tcat = self.ridercat(cat)
-        # lookup team name in rdb
-        dbr = self.meet.rdb.get_rider(team, 'team')
-        if dbr is not None:
-            tname = dbr['first']
+        tname = self.team_meta(team)['name']
         tstr = time.rawtime(1) + ' '  # hunges blanked
         self.meet.cmd_announce(command='teamtime',
                                msg='\x1f'.join(
@@ -1378,15 +1403,11 @@ class trtt(rms):
     def bounceruntime(self, team, cat):
         """Bounce a teamname and running time onto the panel"""
         team = team.upper()
-        tname = ''
         tcat = self.ridercat(cat)
         tstr = ''
-        tstart = None
-        # lookup team name in rdb
-        dbr = self.meet.rdb.get_rider(team, 'team')
-        if dbr is not None:
-            tname = dbr['first']
-            tstart = tod.mktod(dbr['refid'])
+        tm = self.team_meta(team)
+        tname = tm['name']
+        tstart = tm['start']
         if team in self.teamtimes:
             tstr = self.teamtimes[team].rawtime(1) + ' '
         else:
@@ -1411,49 +1432,27 @@ class trtt(rms):
         _log.debug('Recalculate model')
         # clear off old places and bonuses
         self.resetplaces()
-        self.teamtimes = {}
 
         # assign places
         self.assign_finish()
         for c in self.contests:
             self.assign_places(c)
 
-        # arrange all riders in team groups by start time and team code
-        aux = []
-        idx = 0
+        # collect finishers for each team
+        teams = {}
         for r in self.riders:
-            stime = r[COL_STOFT]
-            tlabel = r[COL_TEAM]
-            inrace = r[COL_INRACE]
-            rbib = r[COL_BIB]
+            # flag any manually edited riders as 'seen' and reset bg colour
             rplace = r[COL_PLACE]
-            rtime = tod.MAX
-            rlaps = r[COL_LAPS]
-            if r[COL_RFTIME] is not None:
-                rtime = r[COL_RFTIME]
-            if not inrace:
-                rtime = tod.MAX
+            if not r[COL_INRACE]:
                 rplace = r[COL_COMMENT]
-
-            # flag any manually edited riders as 'seen' and reset bg colour
             if rplace:
                 r[COL_SEEN] = 'MAN'
             if not r[COL_LAPS]:
                 r[COL_LAPCOLOUR] = self.bgcolour(r[COL_LAPS], r[COL_SEEN])
 
-            aux.append((stime, tlabel, not inrace, strops.dnfcode_key(rplace),
-                        -rlaps, rtime, idx, rbib))
-            idx += 1
-        if len(aux) > 1:
-            aux.sort()
-            self.riders.reorder([a[6] for a in aux])
-
-        # re-build cached team map
-        cteam = None
-        self.teammap = {}
-        for r in self.riders:
             nteam = r[COL_TEAM]
-            if nteam != cteam:
+            if nteam not in teams:
+                teams[nteam] = []
                 # only rebuild cat and nth on first load
                 if nteam not in self.teamcats:
                     ncat = self.ridercat(r[COL_CAT])
@@ -1468,41 +1467,27 @@ class trtt(rms):
                                       ncat, nteam, self.nthwheel[ncat], nth)
                     self.teamnth[nteam] = nth
                     self.teamcats[nteam] = ncat
-                self.teammap[nteam] = []
-                cteam = nteam
-            # cteam will be valid at this point
-            if r[COL_RFTIME] is not None:  # will already be sorted!
-                self.teammap[cteam].append(r)
+            if r[COL_RFTIME] is not None:
+                teams[nteam].append((self.team_key(r), r))
                 if r[COL_RFTIME] > self.maxfinish:
                     self.maxfinish = r[COL_RFTIME]
 
-        # scan each team for times
-        for t in self.teammap:
-            # unless team has n finishers, there is no time
-            tlist = self.teammap[t]
-            nth_wheel = self.teamnth[t]
-            if len(tlist) >= nth_wheel:
-                ct = (tlist[nth_wheel - 1][COL_RFTIME] - self.start -
-                      tlist[nth_wheel - 1][COL_STOFT])
-                thetime = ct.round(1)
-                self.teamtimes[t] = thetime  # save to times map
-                if (t not in self.announced_teams and
-                    (self.announce_team is None or self.announce_team == t)):
-                    # bounce this time onto the panel? HACK
-                    self.announced_teams.add(t)
-                    self.running_team = None  # cancel a running time
-                    self.bounceteam(t, self.teamcats[t], thetime)
-                    self.announce_team = None
-                for r in tlist[0:nth_wheel]:
-                    r[COL_CBUNCH] = thetime
-                for r in tlist[nth_wheel:]:
-                    et = r[COL_RFTIME] - self.start - r[COL_STOFT]
-                    if self.owntime and (et > ct and
-                                         (et - ct) > self.gapthresh):
-                        # TIME GAP!
-                        thetime = et.round(1)
-                    r[COL_CBUNCH] = thetime
-                    ct = et
+        # drop teams no longer in the event
+        for t in [t for t in self.teammap if t not in teams]:
+            del self.teammap[t]
+            self._teamsig.pop(t, None)
+            self.teamtimes.pop(t, None)
+
+        # update times only for teams with changed finishers
+        for t, flist in teams.items():
+            flist.sort(key=lambda f: f[0])
+            sig = self.team_sig(t, flist)
+            if t in self.teammap and self._teamsig.get(t) == sig:
+                continue
+            self.teammap[t] = [f[1] for f in flist]
+            self.team_time(t)
+            # signature includes the bunch times just written
+            self._teamsig[t] = self.team_sig(t, flist)
 
         # leave mode sorted by arrival order
         self.reorder_arrivals()  # re-order view by arrivals at finish
@@ -1515,6 +1500,56 @@ class trtt(rms):
         self.calcset = True
         return False  # allow idle add
 
+    def team_sig(self, t, flist):
+        """Return the state of team t finishers used for the team time.
+
+        Includes each finisher's sort key, finish, start offset and
+        bunch time, so edits made outside recalculate are detected.
+        """
+        return (self.start, self.teamnth[t], self.owntime, self.gapthresh, t
+                in self.announced_teams, self.announce_team,
+                tuple((f[0], f[1][COL_BIB], f[1][COL_RFTIME], f[1][COL_STOFT],
+                       f[1][COL_CBUNCH]) for f in flist))
+
+    def team_key(self, r):
+        """Return the order of rider r among team finishers."""
+        rplace = r[COL_PLACE]
+        rtime = r[COL_RFTIME]
+        if not r[COL_INRACE]:
+            rtime = tod.MAX
+            rplace = r[COL_COMMENT]
+        return (not r[COL_INRACE], strops.dnfcode_key(rplace), -r[COL_LAPS],
+                rtime, strops.riderno_key(r[COL_BIB]))
+
+    def team_time(self, t):
+        """Update team time and rider bunch times for team t."""
+        # unless team has n finishers, there is no time
+        tlist = self.teammap[t]
+        nth_wheel = self.teamnth[t]
+        if len(tlist) >= nth_wheel:
+            ct = (tlist[nth_wheel - 1][COL_RFTIME] - self.start -
+                  tlist[nth_wheel - 1][COL_STOFT])
+            thetime = ct.round(1)
+            self.teamtimes[t] = thetime  # save to times map
+            if (t not in self.announced_teams and
+                (self.announce_team is None or self.announce_team == t)):
+                # bounce this time onto the panel? HACK
+                self.announced_teams.add(t)
+                self.running_team = None  # cancel a running time
+                self.bounceteam(t, self.teamcats[t], thetime)
+                self.announce_team = None
+            for r in tlist[0:nth_wheel]:
+                r[COL_CBUNCH] = thetime
+            for r in tlist[nth_wheel:]:
+                et = r[COL_RFTIME] - self.start - r[COL_STOFT]
+                if self.owntime and (et > ct and (et - ct) > self.gapthresh):
+                    # TIME GAP!
+                    thetime = et.round(1)
+                r[COL_CBUNCH] = thetime
+                ct = et
+        else:
+            self.teamtimes.pop(t, None)
+
     def __init__(self, meet, etype, ui=True):
         self.meet = meet
         self.etype = etype
@@ -1528,13 +1563,16 @@ class trtt(rms):
 
         self.recalclock = threading.Lock()
         self._dorecalc = False
+        self._loadstate = None
 
         self.teamnames = {}
         self.teamtimes = {}
         self.teamnth = {}
         self.teamcats = {}
         self.teamclass = {}
-        self.teammap = {}
+        self.teammeta = {}  # team: name, class, start and cat from riderdb
+        self.teammap = {}  # team: ordered finishers, updated on change
+        self._teamsig = {}  # team: finisher state at last team time update
         self.announced_teams = set()
         self.announce_team = None
         self.running_team = None  # show running time for team
@@ -6,7 +6,12 @@ import sys
 import gi
 import logging
 import json
+import queue
 import threading
+from logging.handlers import QueueHandler, QueueListener
+from time import monotonic
+from collections import deque
+from importlib import import_module
 from importlib.resources import files
 from contextlib import suppress
 from subprocess import run
@@ -28,7 +33,6 @@ from metarace import tod
 from metarace import strops
 from metarace.jsonconfig import config
 from metarace.riderdb import rider
-from metarace.standards import Factors, CategoryInfo
 
 _log = logging.getLogger('uiutil')
 _log.setLevel(logging.DEBUG)
@@ -64,6 +68,12 @@ DIGITFONT = Pango.FontDescription('Noto Mono Medium 22')
 MONOFONT = Pango.FontDescription('Noto Mono')
 LOGVIEWFONT = Pango.FontDescription('Noto Mono 11')
 
+# Log view limits
+LOGVIEWLINES = 5000  # default maximum lines kept in log view
+LOGVIEWTRIM = 0.8  # fraction of maximum lines kept after a trim
+LOGVIEWFLUSH = 250  # milliseconds to collect log records before display
+LOGFILEFLUSH = 2.0  # default seconds between log file flushes
+
 # Cell renderer styles
 STYLE_ITALIC = Pango.Style.ITALIC
 STYLE_NORMAL = Pango.Style.NORMAL
@@ -77,6 +87,28 @@ MAX_HEIGHT_FACTOR = 0.9  # Limit window natural height to 90% of screen
 MAX_HEIGHT_MIN = 520  # Min natural height in case screen info is degenerate
 
 
+class lazymodule:
+    """Module proxy that defers import until first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def loaded(self):
+        """Return True if the proxied module has been imported."""
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            _log.debug('Deferred import of %s', self._name)
+            self._module = import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# Standards factors are only required for update
+standards = lazymodule('metarace.standards')
+
+
 class statButton(Gtk.Box):
 
     def __init__(self):
@@ -108,15 +140,32 @@ class statButton(Gtk.Box):
 
 
 class textViewHandler(logging.Handler):
-    """A class for displaying log messages in a GTK text view."""
+    """A class for displaying log messages in a GTK text view.
+
+    Records are collected and appended to the buffer in batches
+    at low priority. Once the buffer holds more than maxlines, older
+    lines are trimmed in bulk down to a fraction of maxlines.
+    """
 
-    def __init__(self, log=None, view=None, scroll=None):
+    def __init__(self, log=None, view=None, scroll=None, maxlines=None):
         self.log = log
         self.view = view
         self.scroll = scroll
         self.scroll_pending = False
+        self.maxlines = LOGVIEWLINES
+        self._pending = deque(maxlen=self.maxlines)
+        self._pendlock = threading.Lock()
+        self._flush_pending = False
+        self.set_maxlines(maxlines)
         logging.Handler.__init__(self)
 
+    def set_maxlines(self, maxlines=None):
+        """Set the maximum number of lines kept in the log view."""
+        if maxlines is not None and maxlines > 0:
+            with self._pendlock:
+                self.maxlines = maxlines
+                self._pending = deque(self._pending, maxlen=maxlines)
+
     def do_scroll(self):
         """Catch up end of scrolled window."""
         if self.scroll_pending:
@@ -125,8 +174,14 @@ class textViewHandler(logging.Handler):
             self.scroll_pending = False
         return False
 
-    def append_log(self, msg):
-        """Append msg to the text view."""
+    def append_log(self):
+        """Append pending messages to the text view and trim old lines."""
+        with self._pendlock:
+            msgs = list(self._pending)
+            self._pending.clear()
+            self._flush_pending = False
+        if not msgs:
+            return False
         atend = False
         if self.scroll:
             pagesz = self.scroll.get_page_size()
@@ -135,7 +190,12 @@ class textViewHandler(logging.Handler):
                 curval = self.scroll.get_value()
                 if maxval - (curval + pagesz) < (0.5 * pagesz):
                     atend = True
-        self.log.insert(self.log.get_end_iter(), msg.strip() + '\n')
+        self.log.insert(self.log.get_end_iter(), '\n'.join(msgs) + '\n')
+        count = self.log.get_line_count() - 1
+        if count > self.maxlines:
+            excess = count - int(LOGVIEWTRIM * self.maxlines)
+            self.log.delete(self.log.get_start_iter(),
+                            self.log.get_iter_at_line(excess))
         if atend:
             if not self.scroll_pending:
                 self.scroll_pending = True
@@ -143,9 +203,15 @@ class textViewHandler(logging.Handler):
         return False
 
     def emit(self, record):
-        """Emit log record to gtk main loop."""
-        msg = self.format(record)
-        GLib.idle_add(self.append_log, msg)
+        """Queue log record for the next batch append in gtk main loop."""
+        msg = self.format(record).strip()
+        with self._pendlock:
+            self._pending.append(msg)
+            if not self._flush_pending:
+                self._flush_pending = True
+                GLib.timeout_add(LOGVIEWFLUSH,
+                                 self.append_log,
+                                 priority=GLib.PRIORITY_LOW)
 
 
 class statusHandler(logging.Handler):
@@ -195,6 +261,108 @@ class statusHandler(logging.Handler):
         GLib.idle_add(self.push_status, msg, record.levelno)
 
 
+class logfileHandler(logging.FileHandler):
+    """A log file handler flushed by the log writer thread."""
+
+    def flush(self):
+        """Defer flush to the log writer."""
+        pass
+
+    def sync(self):
+        """Flush written records to disk."""
+        logging.FileHandler.flush(self)
+
+    def close(self):
+        """Flush and close the log file."""
+        self.sync()
+        logging.FileHandler.close(self)
+
+
+class logWriter(QueueListener):
+    """Pass root log records through a queue to a single writer thread.
+
+    Added handlers are called from the writer thread. Log files are
+    flushed once the queue is idle, at most interval seconds after
+    a write, and when the writer is drained or stopped.
+    """
+
+    def __init__(self, interval=LOGFILEFLUSH):
+        QueueListener.__init__(self,
+                               queue.SimpleQueue(),
+                               respect_handler_level=True)
+        self.interval = interval
+        self._qhandler = QueueHandler(self.queue)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._lastflush = monotonic()
+
+    def set_interval(self, interval=None):
+        """Set the maximum log file flush interval in seconds."""
+        if interval is not None and interval > 0:
+            self.interval = interval
+
+    def add(self, handler):
+        """Add handler to the writer thread."""
+        with self._lock:
+            if handler not in self.handlers:
+                self.handlers = self.handlers + (handler, )
+
+    def remove(self, handler):
+        """Remove handler from the writer thread."""
+        with self._lock:
+            self.handlers = tuple(h for h in self.handlers if h is not handler)
+
+    def start(self):
+        """Start writer thread and attach queue to the root logger."""
+        if self._thread is None:
+            QueueListener.start(self)
+            logging.getLogger().addHandler(self._qhandler)
+
+    def drain(self):
+        """Write out all queued records and flush log files."""
+        if self._thread is not None:
+            # records queued while draining are kept for the next thread
+            QueueListener.stop(self)
+            self.sync()
+            QueueListener.start(self)
+
+    def stop(self):
+        """Detach queue from root logger, drain and stop writer thread."""
+        if self._thread is not None:
+            logging.getLogger().removeHandler(self._qhandler)
+            QueueListener.stop(self)
+            self.sync()
+
+    def sync(self):
+        """Flush all log file handlers."""
+        with self._lock:
+            for h in self.handlers:
+                if isinstance(h, logfileHandler):
+                    h.sync()
+            self._dirty = False
+            self._lastflush = monotonic()
+
+    def handle(self, record):
+        """Pass record to handlers, flushing if interval has elapsed."""
+        with self._lock:
+            QueueListener.handle(self, record)
+            self._dirty = True
+        if monotonic() - self._lastflush >= self.interval:
+            self.sync()
+
+    def dequeue(self, block):
+        """Return the next record, flushing log files while idle."""
+        while True:
+            timeout = None
+            if self._dirty:
+                timeout = max(0.0,
+                              self._lastflush + self.interval - monotonic())
+            try:
+                return self.queue.get(block, timeout)
+            except queue.Empty:
+                self.sync()
+
+
 class timerpane:
 
     def setrider(self, bib=None, ser=None):
@@ -676,9 +844,9 @@ def run_update_check(callback=None, window=None):
 
 def run_standards_update():
     """Perform standards update."""
-    f = Factors()
+    f = standards.Factors()
     f.update()
-    c = CategoryInfo()
+    c = standards.CategoryInfo()
     c.update()
     _UPDATE_PROC['standards']['lock'].release()
     _UPDATE_PROC['standards']['thread'] = None
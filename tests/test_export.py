@@ -0,0 +1,34 @@
+"""Batch export tests, requires Gtk and a display backend."""
+
+import os
+import pytest
+
+gi = pytest.importorskip('gi')
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk
+
+if not Gtk.init_check()[0]:
+    pytest.skip('Gtk display not available, eg use xvfb-run',
+                allow_module_level=True)
+
+import roadmeet
+
+_RIDERS = 'Rider No,First Name,Last Name\n1,Ann,Rider\n2,Bea,Rider\n'
+
+
+def test_export_meet(tmp_path, monkeypatch):
+    """Export a meet folder without a window."""
+    with open(tmp_path / 'riders.csv', 'w') as f:
+        f.write(_RIDERS)
+    monkeypatch.chdir(tmp_path)
+    assert roadmeet.export_meet(str(tmp_path)) is None
+    for name in ('startlist', 'result'):
+        for ext in ('pdf', 'xlsx', 'json', 'html'):
+            fn = '.'.join((name, ext))
+            assert os.path.isfile(tmp_path / roadmeet.EXPORTPATH / fn)
+
+
+def test_export_missing_meet(tmp_path):
+    """Report a missing meet folder."""
+    path = str(tmp_path / 'missing')
+    assert roadmeet.export_meet(path) == 'Meet folder not found'
@@ -0,0 +1,57 @@
+"""Headless meet tests, requires Gtk and a display backend."""
+
+import os
+import pytest
+
+gi = pytest.importorskip('gi')
+gi.require_version('Gtk', '3.0')
+from gi.repository import GLib, Gtk
+
+if not Gtk.init_check()[0]:
+    pytest.skip('Gtk display not available, eg use xvfb-run',
+                allow_module_level=True)
+
+import metarace
+import roadmeet
+
+_RIDERS = 'Rider No,First Name,Last Name,Transponder\n1,Ann,Rider,tag1\n'
+
+
+def _iterate():
+    """Run pending main loop callbacks."""
+    ctx = GLib.MainContext.default()
+    while ctx.iteration(False):
+        pass
+
+
+def test_headless_remote_export(tmp_path, monkeypatch):
+    """Open a meet headless, feed a remote passing and export."""
+    with open(tmp_path / 'riders.csv', 'w') as f:
+        f.write(_RIDERS)
+    monkeypatch.chdir(tmp_path)
+    metarace.init()
+    lf = metarace.lockpath(str(tmp_path))
+    assert lf is not None
+    try:
+        app = roadmeet.headlessmeet(lf)
+        app.loadconfig()
+        assert app.curevent is not None
+        app.curevent.addriders([('1', '', None)])
+        _iterate()
+
+        app.timertopic = 'timer'
+        app.remoteenable = True
+        app.remote_command('timer', '1;rfid;C1;tag1;10:00:00.000')
+        _iterate()
+
+        app.saveconfig()
+        srep, frep = app.build_reports(resfiles=True)
+        app.write_reports(srep, frep)
+        app.close_event()
+    finally:
+        metarace.unlockpath(str(tmp_path), lf)
+
+    for name in ('startlist', 'result'):
+        for ext in ('pdf', 'xlsx', 'json', 'html'):
+            fn = '.'.join((name, ext))
+            assert os.path.isfile(tmp_path / roadmeet.EXPORTPATH / fn)